@@ -0,0 +1,46 @@
+"""Offline plan generation for sessions created with "batch": true.
+
+    python batch.py export requests.jsonl [--session ID ...]
+    # submit requests.jsonl to the provider's batch API, download the results
+    python batch.py ingest results.jsonl [--errors errors.jsonl]
+
+Both commands skip weeks that are already stored and can be re-run.
+"""
+import argparse
+import asyncio
+import json
+import logging
+
+from src.core.database import init_db
+from src.service.batch import BatchGenerationService
+from src.service.sessions import UserCategorySessionService
+
+
+async def main(args):
+    await init_db()
+    service = BatchGenerationService(UserCategorySessionService(llm_client=None))
+
+    if args.command == "export":
+        with open(args.path, "w", encoding="utf-8") as out:
+            report = await service.export(out, args.session)
+    else:
+        with open(args.path, encoding="utf-8") as results:
+            if args.errors:
+                with open(args.errors, "w", encoding="utf-8") as errors:
+                    report = await service.ingest(results, errors)
+            else:
+                report = await service.ingest(results)
+    print(json.dumps(report))
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    commands = parser.add_subparsers(dest="command", required=True)
+    export = commands.add_parser("export", help="write batch request lines")
+    export.add_argument("path")
+    export.add_argument("--session", action="append", help="only these session ids")
+    ingest = commands.add_parser("ingest", help="store a batch results file")
+    ingest.add_argument("path")
+    ingest.add_argument("--errors", help="write failing lines here as JSONL")
+    asyncio.run(main(parser.parse_args()))
@@ -0,0 +1,69 @@
+import copy
+import json
+from collections import Counter
+from pathlib import Path
+from typing import List
+
+from pymongo import monitoring
+
+FIXTURE_PATH = Path(__file__).resolve().parent.parent / "schedule.json"
+
+
+def load_fixture_weeks() -> List[dict]:
+    """Return the distinct weeks of the bundled schedule.json fixture."""
+    with open(FIXTURE_PATH) as f:
+        data = json.load(f)
+    weeks = {}
+    for month in data["months"]:
+        for week in month["weeks"]:
+            weeks.setdefault((week["month"], week["week"]), week)
+    return [weeks[key] for key in sorted(weeks)]
+
+
+def fixture_week(month: int, week: int) -> dict:
+    """Fixture week relabelled as (month, week), cycling through the fixture."""
+    weeks = load_fixture_weeks()
+    week_data = copy.deepcopy(weeks[((month - 1) * 4 + (week - 1)) % len(weeks)])
+    week_data["month"] = month
+    week_data["week"] = week
+    return week_data
+
+
+def fixture_week_content(month: int, week: int) -> dict:
+    """Fixture week as the LLM now returns it: content only, no calendar fields."""
+    return {
+        "days": [
+            {key: day[key] for key in ("meals", "workout", "total_calories", "total_calories_burned") if key in day}
+            for day in fixture_week(month, week)["days"]
+        ]
+    }
+
+
+class CommandCounter(monitoring.CommandListener):
+    """Counts every command the driver sends to Mongo (one per round trip)."""
+
+    def __init__(self):
+        self.counts = Counter()
+
+    def started(self, event):
+        self.counts[event.command_name] += 1
+
+    def succeeded(self, event):
+        pass
+
+    def failed(self, event):
+        pass
+
+    def reset(self):
+        self.counts.clear()
+
+    @property
+    def total(self) -> int:
+        return sum(self.counts.values())
+
+
+def percentile(values: List[float], p: float) -> float:
+    if not values:
+        return 0.0
+    values = sorted(values)
+    return values[min(len(values) - 1, int(round(p / 100 * (len(values) - 1))))]
@@ -0,0 +1,186 @@
+"""End-to-end session generation benchmark.
+
+Start Mongo, the fake LLM (python -m benchmarks.fake_llm), the API and at
+least one worker with LLM_BASE_URL pointing at the fake, then:
+
+    MONGO_URI=mongodb://localhost:27020 python -m benchmarks.e2e_generation \\
+        --api http://localhost:9001/api/v1 --users 20 --concurrency 10
+
+Every virtual user registers, creates a session, polls until it is ACTIVE,
+reads it, completes it and downloads the PDF. Reports throughput,
+p50/p95/p99 per stage and the Mongo operations the run caused.
+"""
+import argparse
+import asyncio
+import os
+import time
+import uuid
+from collections import defaultdict
+
+import httpx
+from motor.motor_asyncio import AsyncIOMotorClient
+
+from benchmarks.common import percentile
+
+STAGES = ["create", "first_week", "generation", "get", "complete", "pdf"]
+
+
+def _session_id(session: dict) -> str:
+    return session.get("_id") or session.get("id")
+
+
+async def _opcounters(mongo):
+    if mongo is None:
+        return None
+    status = await mongo.admin.command("serverStatus")
+    return dict(status["opcounters"])
+
+
+class Run:
+    def __init__(self, client: httpx.AsyncClient, category_id: str, args):
+        self.client = client
+        self.category_id = category_id
+        self.args = args
+        self.timings = defaultdict(list)
+        self.failures = defaultdict(int)
+
+    async def timed(self, stage: str, coro):
+        started = time.perf_counter()
+        response = await coro
+        self.timings[stage].append(time.perf_counter() - started)
+        response.raise_for_status()
+        return response
+
+    async def user_flow(self):
+        email = f"bench-{uuid.uuid4().hex[:12]}@example.com"
+        tokens = (
+            await self.client.post(
+                "/auth/register",
+                json={
+                    "first_name": "Bench",
+                    "last_name": "User",
+                    "email": email,
+                    "password": "benchmark",
+                    "physical_data": {
+                        "weight": 82,
+                        "height": 178,
+                        "age": 31,
+                        "blood_sugar": 5.1,
+                        "activity_level": "moderate",
+                        "gender": "male",
+                    },
+                },
+            )
+        ).json()
+        headers = {"Authorization": f"Bearer {tokens['access_token']}"}
+
+        response = await self.timed(
+            "create",
+            self.client.post(
+                "/session/create",
+                headers=headers,
+                json={
+                    "category_id": self.category_id,
+                    "goal": f"Lose 5 kg ({uuid.uuid4().hex[:6]})",
+                    "duration": self.args.duration,
+                    "comments": "No nuts",
+                    "mode": self.args.mode,
+                },
+            ),
+        )
+        session_id = _session_id(response.json())
+
+        started = time.perf_counter()
+        first_week_seen = False
+        deadline = started + self.args.timeout
+        while True:
+            if time.perf_counter() > deadline:
+                self.failures["generation_timeout"] += 1
+                return
+            await asyncio.sleep(self.args.poll_interval)
+            if not first_week_seen:
+                days = (await self.client.get(f"/session/{session_id}/days", headers=headers)).json()["items"]
+                if days:
+                    first_week_seen = True
+                    self.timings["first_week"].append(time.perf_counter() - started)
+            active = (
+                await self.client.get("/session/list", params={"status": "active"}, headers=headers)
+            ).json()["items"]
+            if any(_session_id(s) == session_id for s in active):
+                break
+            failed = (
+                await self.client.get("/session/list", params={"status": "failed"}, headers=headers)
+            ).json()["items"]
+            if any(_session_id(s) == session_id for s in failed):
+                self.failures["generation_failed"] += 1
+                return
+        self.timings["generation"].append(time.perf_counter() - started)
+
+        await self.timed("get", self.client.get(f"/session/{session_id}/days", headers=headers))
+        await self.timed(
+            "complete",
+            self.client.get(
+                f"/session/compete/{session_id}", params={"weight_after": 79.5}, headers=headers
+            ),
+        )
+        await self.timed("pdf", self.client.get(f"/session/generate-pdf/{session_id}"))
+
+    async def guarded_flow(self, semaphore: asyncio.Semaphore):
+        async with semaphore:
+            try:
+                await self.user_flow()
+            except Exception as e:
+                self.failures[type(e).__name__] += 1
+
+
+async def run(args):
+    mongo = AsyncIOMotorClient(os.environ["MONGO_URI"]) if os.getenv("MONGO_URI") else None
+    async with httpx.AsyncClient(base_url=args.api, timeout=args.timeout) as client:
+        category = (
+            await client.post(
+                "/category/create",
+                json={"name": "Weight loss", "description": "benchmark category"},
+            )
+        ).json()
+        bench = Run(client, _session_id(category), args)
+
+        ops_before = await _opcounters(mongo)
+        started = time.perf_counter()
+        semaphore = asyncio.Semaphore(args.concurrency)
+        await asyncio.gather(*(bench.guarded_flow(semaphore) for _ in range(args.users)))
+        elapsed = time.perf_counter() - started
+        ops_after = await _opcounters(mongo)
+
+    completed = len(bench.timings["pdf"])
+    print(f"{completed}/{args.users} sessions completed in {elapsed:.1f}s "
+          f"({completed / elapsed * 60:.2f} sessions/min)")
+    print(f"{'stage':12s} {'n':>5s} {'p50':>9s} {'p95':>9s} {'p99':>9s}")
+    for stage in STAGES:
+        values = bench.timings[stage]
+        print(
+            f"{stage:12s} {len(values):5d} "
+            + " ".join(f"{percentile(values, p):8.2f}s" for p in (50, 95, 99))
+        )
+    if bench.failures:
+        print("failures:", dict(bench.failures))
+    if ops_before and ops_after:
+        diff = {op: ops_after[op] - ops_before[op] for op in ops_after}
+        per_session = {op: round(count / max(completed, 1), 1) for op, count in diff.items()}
+        print("mongo ops total:", diff)
+        print("mongo ops per completed session:", per_session)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--api", default="http://localhost:9001/api/v1")
+    parser.add_argument("--users", type=int, default=10)
+    parser.add_argument("--concurrency", type=int, default=10)
+    parser.add_argument("--duration", type=int, default=3)
+    parser.add_argument("--mode", choices=["standard", "economy"], default="standard")
+    parser.add_argument("--poll-interval", type=float, default=1.0)
+    parser.add_argument("--timeout", type=float, default=600.0)
+    asyncio.run(run(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
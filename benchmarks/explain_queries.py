@@ -0,0 +1,144 @@
+"""Check that every hot service query is served by an index.
+
+Runs explain() for each query and aggregation below against the database in
+MONGO_URI (indexes are created by init_db) and exits with status 1 if any
+winning plan contains a COLLSCAN:
+
+    MONGO_URI=mongodb://localhost:27020 python -m benchmarks.explain_queries
+
+tests/test_query_plans.py runs the same check under pytest (and in CI).
+"""
+import asyncio
+import sys
+from datetime import datetime
+from typing import List, Tuple
+
+from bson import ObjectId
+
+from src.core import database
+from src.core.database import init_db
+from src.helpers.pagination import NEXT, PREV, keyset_filter, keyset_sort
+from src.models.jobs import JobStatus
+from src.models.sessions import SessionStatus
+from src.repositories.sessions import day_plan_filter, session_filter
+from src.service.sessions import week_filter
+
+USER_ID = str(ObjectId())
+SESSION_ID = str(ObjectId())
+DAY_PLAN_ID = str(ObjectId())
+EDGE_DATE = datetime(2025, 1, 1)
+
+# (name, collection, filter, sort) mirroring the queries in src/service,
+# src/repositories and src/helpers. Wherever the service builds a filter
+# with a helper, the same helper builds it here; writes are explained as
+# a find on their filter, which picks the same plan.
+QUERIES = [
+    ("auth.login", "users", {"email": "bench@example.com"}, None),
+    ("sessions.get_sessions", "user_category_sessions",
+     {"user_id": USER_ID, "status": SessionStatus.ACTIVE.value},
+     keyset_sort("last_updated", NEXT, descending=True)),
+    ("sessions.list_sessions_page", "user_category_sessions",
+     {"user_id": USER_ID, "status": SessionStatus.ACTIVE.value,
+      **keyset_filter("last_updated", NEXT, EDGE_DATE, ObjectId(), descending=True)},
+     keyset_sort("last_updated", NEXT, descending=True)),
+    ("sessions.recent", "user_category_sessions",
+     {"user_id": USER_ID}, [("last_updated", -1)]),
+    ("sessions.idempotency_key", "user_category_sessions",
+     {"user_id": USER_ID, "idempotency_key": "key"}, None),
+    ("sessions.inflight_key", "user_category_sessions",
+     {"user_id": USER_ID, "inflight_key": "hash"}, None),
+    ("repository.update_session", "user_category_sessions",
+     session_filter(SESSION_ID, expected_version=3,
+                    exclude_statuses=(SessionStatus.COMPLETED,),
+                    match={"target_weeks": 4}), None),
+    ("batch.pending_sessions", "user_category_sessions",
+     {"batch": True, "status": {"$in": [SessionStatus.PENDING.value, SessionStatus.PROCESSING.value]}}, None),
+    ("sessions.day_plans", "day_plans", {"session_id": SESSION_ID}, keyset_sort("date", NEXT)),
+    ("sessions.stored_weeks", "day_plans", {"session_id": SESSION_ID}, None),
+    ("sessions.stored_weeks_delete_partial", "day_plans",
+     {"_id": {"$in": [ObjectId(), ObjectId()]}}, None),
+    ("sessions.day_plans_next_page", "day_plans",
+     {"session_id": SESSION_ID, **keyset_filter("date", NEXT, EDGE_DATE, ObjectId())},
+     keyset_sort("date", NEXT)),
+    ("sessions.day_plans_prev_page", "day_plans",
+     {"session_id": SESSION_ID, **keyset_filter("date", PREV, EDGE_DATE, ObjectId())},
+     keyset_sort("date", PREV)),
+    ("sessions.day_plans_week", "day_plans",
+     {"session_id": SESSION_ID, **week_filter(1, 2)}, keyset_sort("date", NEXT)),
+    ("repository.update_day_plan", "day_plans", day_plan_filter(SESSION_ID, DAY_PLAN_ID), None),
+    ("jobs.enqueue", "generation_jobs",
+     {"session_id": SESSION_ID, "status": {"$in": [JobStatus.QUEUED.value, JobStatus.RUNNING.value]}}, None),
+    ("jobs.active_key", "generation_jobs", {"active_key": SESSION_ID}, None),
+    ("jobs.lease", "generation_jobs",
+     {"$or": [{"status": JobStatus.QUEUED.value},
+              {"status": JobStatus.RUNNING.value, "lease_expires_at": {"$lt": datetime.utcnow()}}]},
+     [("created_at", 1)]),
+    ("schedule_cache.get", "week_schedule_cache", {"key": "0" * 64}, None),
+    ("llm_metrics.session_summary", "llm_calls", {"session_id": SESSION_ID}, None),
+    ("counters.next_sequence", "counters", {"_id": "dayplan_index"}, None),
+]
+
+# (name, collection, pipeline)
+AGGREGATIONS = [
+    ("profile.session_counts", "user_category_sessions",
+     [{"$match": {"user_id": USER_ID}},
+      {"$group": {"_id": "$status", "count": {"$sum": 1}}}]),
+]
+
+
+def _stages(plan: dict):
+    yield plan.get("stage")
+    for key in ("inputStage", "queryPlan"):
+        if key in plan:
+            yield from _stages(plan[key])
+    for child in plan.get("inputStages", []):
+        yield from _stages(child)
+
+
+def _winning_plans(explain):
+    # Aggregation explains nest the plan under stages[].$cursor, or not at
+    # all when the pipeline is pushed down into the query.
+    if isinstance(explain, dict):
+        for key, value in explain.items():
+            if key == "winningPlan":
+                yield value
+            else:
+                yield from _winning_plans(value)
+    elif isinstance(explain, list):
+        for item in explain:
+            yield from _winning_plans(item)
+
+
+def _plan_stages(explain: dict) -> List[str]:
+    return [stage for plan in _winning_plans(explain) for stage in _stages(plan) if stage]
+
+
+async def explain_all() -> List[Tuple[str, List[str]]]:
+    """(name, winning plan stages) for every entry in QUERIES and AGGREGATIONS."""
+    await init_db()
+    results = []
+    for name, collection, query, sort in QUERIES:
+        cursor = database.db[collection].find(query)
+        if sort:
+            cursor = cursor.sort(sort)
+        results.append((name, _plan_stages(await cursor.explain())))
+    for name, collection, pipeline in AGGREGATIONS:
+        explain = await database.db.command(
+            {"explain": {"aggregate": collection, "pipeline": pipeline, "cursor": {}},
+             "verbosity": "queryPlanner"}
+        )
+        results.append((name, _plan_stages(explain)))
+    return results
+
+
+async def main() -> int:
+    failures = 0
+    for name, stages in await explain_all():
+        ok = "COLLSCAN" not in stages
+        failures += not ok
+        print(f"{'ok  ' if ok else 'FAIL'} {name:32s} {' <- '.join(stages)}")
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(asyncio.run(main()))
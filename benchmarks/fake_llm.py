@@ -0,0 +1,180 @@
+"""OpenAI-compatible stand-in for OpenRouter that replays schedule.json.
+
+    python -m benchmarks.fake_llm --port 9100 --latency-ms 3000 --error-rate 0.02
+
+then point the API and worker at it with LLM_BASE_URL=http://localhost:9100/v1.
+Weekly prompts get a fixture week back (economy base weeks also get
+alternatives), progress analysis gets a canned report. Latency is log-normal around --latency-ms; --error-rate answers with
+HTTP 429/500 and --malformed-rate cuts the JSON in half.
+"""
+import argparse
+import asyncio
+import json
+import random
+import re
+import time
+import uuid
+
+import uvicorn
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse, StreamingResponse
+
+from benchmarks.common import fixture_week_content
+
+WEEK_RE = re.compile(r"week (\d+) of month (\d+)", re.IGNORECASE)
+
+ANALYSIS = {
+    "goal_achieved": False,
+    "progress_summary": "User lost 2 kg, achieved 40% of the goal.",
+    "summary": "Solid adherence in the first month, weaker afterwards.",
+    "fun_fact": "Your longest streak was 9 days!",
+    "state_changes": {
+        "wellbeing_summary": "More energy reported in later weeks.",
+        "nutrition_adherence": "Mostly followed the plan on weekdays.",
+    },
+}
+
+
+class FakeLLMConfig:
+    latency_ms = 2000.0
+    latency_sigma = 0.5
+    error_rate = 0.0
+    malformed_rate = 0.0
+    chunk_size = 64
+
+
+config = FakeLLMConfig()
+app = FastAPI()
+
+
+def _economy_week(month: int) -> dict:
+    """Base week plus alternatives borrowed from the fixture's other weeks."""
+    week_data = fixture_week_content(month, 1)
+    week_data["meal_alternatives"] = [
+        meal for day in fixture_week_content(month, 2)["days"][:2] for meal in day["meals"]
+    ]
+    week_data["exercise_alternatives"] = [
+        exercise for day in fixture_week_content(month, 3)["days"] for exercise in day["workout"]
+    ][:4]
+    return week_data
+
+
+def _answer(prompt: str) -> str:
+    match = WEEK_RE.search(prompt)
+    if match:
+        week, month = int(match.group(1)), int(match.group(2))
+        if "meal_alternatives" in prompt:
+            content = json.dumps(_economy_week(month))
+        else:
+            content = json.dumps(fixture_week_content(month, week))
+    else:
+        content = json.dumps(ANALYSIS)
+    if random.random() < config.malformed_rate:
+        content = content[: len(content) // 2]
+    return content
+
+
+# Crude prefix cache: a system message seen before counts as cached input.
+_seen_prefixes = set()
+
+
+def _cached_tokens(messages: list) -> int:
+    if not messages or messages[0].get("role") != "system":
+        return 0
+    prefix = str(messages[0].get("content", ""))
+    if prefix in _seen_prefixes:
+        return len(prefix) // 4
+    _seen_prefixes.add(prefix)
+    return 0
+
+
+def _usage(prompt: str, content: str, cached_tokens: int = 0) -> dict:
+    prompt_tokens, completion_tokens = len(prompt) // 4, len(content) // 4
+    return {
+        "prompt_tokens": prompt_tokens,
+        "completion_tokens": completion_tokens,
+        "total_tokens": prompt_tokens + completion_tokens,
+        "prompt_tokens_details": {"cached_tokens": min(cached_tokens, prompt_tokens)},
+    }
+
+
+@app.post("/v1/chat/completions")
+async def chat_completions(request: Request):
+    body = await request.json()
+    model = body.get("model", "fake")
+    prompt = "\n".join(str(m.get("content", "")) for m in body.get("messages", []))
+    latency = random.lognormvariate(0, config.latency_sigma) * config.latency_ms / 1000
+
+    if random.random() < config.error_rate:
+        await asyncio.sleep(latency / 10)
+        status = random.choice([429, 500])
+        return JSONResponse({"error": {"message": "fake upstream error", "code": status}}, status_code=status)
+
+    content = _answer(prompt)
+    cached_tokens = _cached_tokens(body.get("messages", []))
+    completion_id = f"chatcmpl-{uuid.uuid4().hex}"
+    created = int(time.time())
+
+    if not body.get("stream"):
+        await asyncio.sleep(latency)
+        return {
+            "id": completion_id,
+            "object": "chat.completion",
+            "created": created,
+            "model": model,
+            "choices": [
+                {
+                    "index": 0,
+                    "message": {"role": "assistant", "content": content},
+                    "finish_reason": "stop",
+                }
+            ],
+            "usage": _usage(prompt, content, cached_tokens),
+        }
+
+    async def events():
+        pieces = [content[i:i + config.chunk_size] for i in range(0, len(content), config.chunk_size)]
+        delay = latency / max(len(pieces), 1)
+        for piece in pieces:
+            await asyncio.sleep(delay)
+            chunk = {
+                "id": completion_id,
+                "object": "chat.completion.chunk",
+                "created": created,
+                "model": model,
+                "choices": [{"index": 0, "delta": {"content": piece}, "finish_reason": None}],
+            }
+            yield f"data: {json.dumps(chunk)}\n\n"
+        final = {
+            "id": completion_id,
+            "object": "chat.completion.chunk",
+            "created": created,
+            "model": model,
+            "choices": [],
+            "usage": _usage(prompt, content, cached_tokens),
+        }
+        yield f"data: {json.dumps(final)}\n\n"
+        yield "data: [DONE]\n\n"
+
+    return StreamingResponse(events(), media_type="text/event-stream")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--host", default="0.0.0.0")
+    parser.add_argument("--port", type=int, default=9100)
+    parser.add_argument("--latency-ms", type=float, default=config.latency_ms)
+    parser.add_argument("--latency-sigma", type=float, default=config.latency_sigma)
+    parser.add_argument("--error-rate", type=float, default=config.error_rate)
+    parser.add_argument("--malformed-rate", type=float, default=config.malformed_rate)
+    args = parser.parse_args()
+
+    config.latency_ms = args.latency_ms
+    config.latency_sigma = args.latency_sigma
+    config.error_rate = args.error_rate
+    config.malformed_rate = args.malformed_rate
+    uvicorn.run(app, host=args.host, port=args.port, log_level="warning")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,93 @@
+"""Count Mongo round trips needed to persist one generated session.
+
+Runs against the database in MONGO_URI with the LLM replaced by the bundled
+schedule.json fixture:
+
+    MONGO_URI=mongodb://localhost:27020 python -m benchmarks.mongo_round_trips
+"""
+import argparse
+import asyncio
+
+from benchmarks.common import CommandCounter, fixture_week_content
+from src.core.database import init_db
+from src.helpers.ai_schedule import plan_weeks
+from src.helpers.plan_calendar import place_week, plan_start_date
+from src.models.category import Category
+from src.models.sessions import DayPlan, UserCategorySession
+from src.models.user import PhysicalData, User
+from src.schemas.ai.schedule import WeekContent, WeekFragment
+from src.service.sessions import UserCategorySessionService
+
+
+class FixtureScheduleGenerator:
+    async def iter_full_schedule(
+        self, physical_data, category, goal, comments, duration, skip_weeks=None,
+        plan_start=None, weeks=None, progress_note=None, mode=None,
+    ):
+        plan_start = plan_start or plan_start_date()
+        for month, week in weeks or plan_weeks(duration):
+            if (month, week) not in (skip_weeks or set()):
+                content = WeekContent.model_validate(fixture_week_content(month, week))
+                week_data = place_week(content, plan_start, month, week)
+                yield WeekFragment(month=month, week=week, days=week_data.days)
+
+
+async def run(sessions: int, duration: int):
+    counter = CommandCounter()
+    await init_db(event_listeners=[counter])
+
+    physical_data = PhysicalData(weight=80, height=180, age=30)
+    await physical_data.insert()
+    user = User(
+        first_name="Bench",
+        last_name="Mark",
+        email="benchmark@example.com",
+        password="-",
+        physical_data_id=str(physical_data.id),
+    )
+    await user.insert()
+    category = Category(name="Weight loss", description="benchmark")
+    await category.insert()
+
+    service = UserCategorySessionService(llm_client=None)
+    service.schedule_generator = FixtureScheduleGenerator()
+
+    created = []
+    per_session = []
+    for _ in range(sessions):
+        session = UserCategorySession(
+            user_id=str(user.id),
+            category_id=str(category.id),
+            goal="Lose 5 kg",
+            comments="",
+            duration=duration,
+        )
+        await session.insert()
+        created.append(session)
+
+        counter.reset()
+        await service.generate_full_schedule(str(session.id))
+        per_session.append(dict(counter.counts))
+
+    for counts in per_session:
+        print(f"{sum(counts.values()):4d} round trips  {counts}")
+
+    for session in created:
+        session = await UserCategorySession.get(session.id)
+        await DayPlan.find({"session_id": str(session.id)}).delete()
+        await session.delete()
+    await category.delete()
+    await user.delete()
+    await physical_data.delete()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--sessions", type=int, default=3)
+    parser.add_argument("--duration", type=int, default=3)
+    args = parser.parse_args()
+    asyncio.run(run(args.sessions, args.duration))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,41 @@
+"""Micro-benchmark: parsing one AI week payload from the schedule.json fixture.
+
+    python -m benchmarks.parse_week --number 2000
+"""
+import argparse
+import json
+import timeit
+
+from benchmarks.common import load_fixture_weeks
+from src.schemas.ai.schedule import WeekSchedule
+
+
+def untyped(raw: str):
+    # What the pipeline used to do: validate-by-loads, load again, walk dicts.
+    json.loads(raw)
+    week_data = json.loads(raw)
+    return [
+        (day["day_number"], day["date"], day["meals"], day["workout"], day["total_calories"])
+        for day in week_data["days"]
+    ]
+
+
+def typed(raw: str):
+    return WeekSchedule.model_validate_json(raw)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--number", type=int, default=2000)
+    args = parser.parse_args()
+
+    payloads = [json.dumps(week) for week in load_fixture_weeks()]
+    print(f"{len(payloads)} fixture weeks, {sum(map(len, payloads)) // len(payloads)} bytes each on average")
+    for name, fn in (("json.loads x2 + dicts", untyped), ("WeekSchedule.model_validate_json", typed)):
+        seconds = timeit.timeit(lambda: [fn(raw) for raw in payloads], number=args.number)
+        per_week_us = seconds / (args.number * len(payloads)) * 1e6
+        print(f"{name:36s} {per_week_us:8.1f} µs/week")
+
+
+if __name__ == "__main__":
+    main()
@@ -4,13 +4,16 @@ from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 
 from src.api.v1 import api_router
+from src.core.container import close_llm_client, init_llm_client
 from src.core.database import init_db
 
 
 @asynccontextmanager
 async def lifespan(_: FastAPI):
     await init_db()
+    init_llm_client()
     yield
+    await close_llm_client()
 
 
 def make_app():
@@ -39,5 +42,4 @@ if __name__ == "__main__":
         host="0.0.0.0",
         port=9001,
         reload=True,
-        timeout_graceful_shutdown=360,
     )
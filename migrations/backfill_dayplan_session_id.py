@@ -0,0 +1,47 @@
+"""One-off: give every DayPlan the session_id/user_id of the session listing it.
+
+Sessions created before DayPlan carried session_id only reference their days
+through ai_generated_plan_table_ids. This copies the reference onto the
+DayPlans (one update_many per session, only where session_id is missing, so
+it can be re-run safely), after which reads use the (session_id, date) index.
+
+    MONGO_URI=... python -m migrations.backfill_dayplan_session_id [--clear-id-lists]
+
+--clear-id-lists empties the legacy id lists of migrated sessions afterwards.
+"""
+import argparse
+import asyncio
+import logging
+
+from bson import ObjectId
+
+from src.core.database import init_db
+from src.models.sessions import DayPlan, UserCategorySession
+
+logger = logging.getLogger(__name__)
+
+
+async def main(clear_id_lists: bool):
+    await init_db()
+    sessions = plans = 0
+    query = {"ai_generated_plan_table_ids.0": {"$exists": True}}
+    async for session in UserCategorySession.find(query):
+        ids = [ObjectId(id) for id in session.ai_generated_plan_table_ids]
+        result = await DayPlan.get_motor_collection().update_many(
+            {"_id": {"$in": ids}, "session_id": None},
+            {"$set": {"session_id": str(session.id), "user_id": session.user_id}},
+        )
+        plans += result.modified_count
+        sessions += 1
+        if clear_id_lists:
+            await UserCategorySession.get_motor_collection().update_one(
+                {"_id": session.id}, {"$set": {"ai_generated_plan_table_ids": []}}
+            )
+    logger.info(f"Backfilled {plans} day plans across {sessions} sessions.")
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--clear-id-lists", action="store_true")
+    asyncio.run(main(parser.parse_args().clear_id_lists))
@@ -0,0 +1,50 @@
+"""One-off: resolve duplicate user emails before the unique email index is built.
+
+Registration did not check for an existing email before, so a database may
+hold several users with the same address, and init_beanie then fails to
+build the unique index on users.email. Run this before deploying that index:
+
+    MONGO_URI=... python -m migrations.dedupe_user_emails [--dry-run]
+
+For every duplicated email the oldest account (the one login found first)
+keeps the address; the others are renamed to "<email>.dup-<id>" instead of
+being deleted, so their sessions stay in place and can be merged by hand.
+Safe to re-run: once no duplicates are left it does nothing.
+"""
+import argparse
+import asyncio
+import logging
+import os
+
+from motor.motor_asyncio import AsyncIOMotorClient
+
+logger = logging.getLogger(__name__)
+
+
+async def main(dry_run: bool):
+    # Not init_db: init_beanie would try (and fail) to build the very index
+    # this script is clearing the way for.
+    users = AsyncIOMotorClient(os.getenv("MONGO_URI")).nutrition.users
+    pipeline = [
+        {"$group": {"_id": "$email", "ids": {"$push": "$_id"}, "count": {"$sum": 1}}},
+        {"$match": {"count": {"$gt": 1}}},
+    ]
+    emails = renamed = 0
+    async for group in users.aggregate(pipeline):
+        emails += 1
+        keep, *duplicates = sorted(group["ids"])
+        for user_id in duplicates:
+            new_email = f"{group['_id']}.dup-{user_id}"
+            logger.info(f"{group['_id']}: keeping {keep}, renaming {user_id} to {new_email}")
+            if not dry_run:
+                await users.update_one({"_id": user_id}, {"$set": {"email": new_email}})
+            renamed += 1
+    logger.info(
+        f"{'Would rename' if dry_run else 'Renamed'} {renamed} users across {emails} duplicated emails.")
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--dry-run", action="store_true")
+    asyncio.run(main(parser.parse_args().dry_run))
@@ -1,11 +1,14 @@
-from fastapi import APIRouter
+from fastapi import APIRouter, Depends
 
 from src.api.v1.auth import auth_router
 from src.api.v1.category import category_router
+from src.api.v1.metrics import metrics_router
 from src.api.v1.profile import profile_router
 from src.api.v1.sessions import user_session_router
+from src.helpers.llm_metrics import bind_route_attribution
 
-api_router = APIRouter(prefix="/api/v1")
+api_router = APIRouter(
+    prefix="/api/v1", dependencies=[Depends(bind_route_attribution)])
 
 api_router.include_router(auth_router, prefix="/auth", tags=["auth"])
 api_router.include_router(profile_router, prefix="/profile", tags=["profile"])
@@ -13,3 +16,5 @@ api_router.include_router(
     category_router, prefix="/category", tags=["category"])
 api_router.include_router(
     user_session_router, prefix="/session", tags=["session"])
+api_router.include_router(
+    metrics_router, prefix="/metrics", tags=["metrics"])
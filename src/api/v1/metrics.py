@@ -0,0 +1,34 @@
+from fastapi import APIRouter, Depends
+
+from src.core.auth_middleware import get_current_user, require_metrics_token
+from src.helpers.llm_governor import llm_governor
+from src.helpers.llm_metrics import llm_metrics
+from src.helpers.llm_policy import weekly_schedule_policy
+from src.service.sessions import UserCategorySessionService
+
+metrics_router = APIRouter()
+
+
+@metrics_router.get("/llm", dependencies=[Depends(require_metrics_token)])
+async def get_llm_metrics():
+    return llm_metrics.snapshot()
+
+
+@metrics_router.get("/llm/governor", dependencies=[Depends(require_metrics_token)])
+async def get_llm_governor_metrics():
+    return llm_governor.get_metrics()
+
+
+@metrics_router.get("/llm/policy", dependencies=[Depends(require_metrics_token)])
+async def get_llm_policy_metrics():
+    return weekly_schedule_policy.get_metrics()
+
+
+@metrics_router.get("/llm/sessions/{session_id}")
+async def get_session_llm_metrics(
+    session_id: str,
+    token: dict = Depends(get_current_user),
+    session_service: UserCategorySessionService = Depends(
+        UserCategorySessionService),
+):
+    return await session_service.get_llm_usage(session_id, token.get("sub"))
@@ -1,14 +1,17 @@
-from fastapi import APIRouter, BackgroundTasks, Depends
+from typing import Optional
+
+from fastapi import APIRouter, Depends, Header, Query
 
 from src.models.sessions import SessionStatus
 from src.core.auth_middleware import get_current_user
 from src.schemas.req.sessions import DayPlanUpdate, SessionCreateReq
+from src.schemas.resp.sessions import DayPlanPage, SessionSummaryPage
 from src.service.sessions import UserCategorySessionService
 
 user_session_router = APIRouter()
 
 
-@user_session_router.get("/get")
+@user_session_router.get("/get", deprecated=True)
 async def get_sessions(
     status: SessionStatus,
     token: dict = Depends(get_current_user),
@@ -18,25 +21,77 @@ async def get_sessions(
     return await session_service.get_sessions(token.get("sub"), status.value)
 
 
+@user_session_router.get("/list", response_model=SessionSummaryPage)
+async def list_sessions(
+    status: SessionStatus,
+    fields: Optional[str] = Query(None, description="Comma-separated SessionSummary fields"),
+    limit: int = Query(20, ge=1, le=100),
+    cursor: Optional[str] = None,
+    token: dict = Depends(get_current_user),
+    session_service: UserCategorySessionService = Depends(
+        UserCategorySessionService),
+):
+    return await session_service.list_sessions(
+        token.get("sub"),
+        status.value,
+        [name.strip() for name in fields.split(",") if name.strip()] if fields else None,
+        limit,
+        cursor,
+    )
+
+
 @user_session_router.post("/create")
 async def create_session(
     req: SessionCreateReq,
-    bg_tasks: BackgroundTasks,
+    idempotency_key: Optional[str] = Header(None, alias="Idempotency-Key"),
     token: dict = Depends(get_current_user),
     session_service: UserCategorySessionService = Depends(
         UserCategorySessionService),
 ):
-    return await session_service.create_session(bg_tasks, token.get("sub"), req)
+    return await session_service.create_session(
+        token.get("sub"), req, idempotency_key
+    )
 
 
-@user_session_router.get("/{session_id}")
+@user_session_router.get("/{session_id}", deprecated=True)
 async def get_session_by_id(
     session_id: str,
-    offset: int = 0,
+    offset: int = Query(0, ge=0),
+    token: dict = Depends(get_current_user),
+    session_service: UserCategorySessionService = Depends(
+        UserCategorySessionService),
+):
+    return await session_service.get_session_by_id(
+        session_id, token.get("sub"), offset
+    )
+
+
+@user_session_router.get("/{session_id}/days", response_model=DayPlanPage)
+async def get_session_days(
+    session_id: str,
+    cursor: Optional[str] = None,
+    month: Optional[int] = Query(None, ge=1, le=3),
+    week: Optional[int] = Query(None, ge=1, le=4),
+    limit: int = Query(7, ge=1, le=31),
+    token: dict = Depends(get_current_user),
     session_service: UserCategorySessionService = Depends(
         UserCategorySessionService),
 ):
-    return await session_service.get_session_by_id(session_id, offset)
+    return await session_service.get_session_days(
+        session_id, token.get("sub"), cursor, month, week, limit
+    )
+
+
+@user_session_router.post("/{session_id}/regenerate-missing")
+async def regenerate_missing_weeks(
+    session_id: str,
+    token: dict = Depends(get_current_user),
+    session_service: UserCategorySessionService = Depends(
+        UserCategorySessionService),
+):
+    return await session_service.regenerate_missing_weeks(
+        session_id, token.get("sub")
+    )
 
 
 @user_session_router.patch("/sessions/{session_id}/day-plan/{day_plan_id}")
@@ -44,10 +99,13 @@ async def update_session_day_plan(
     session_id: str,
     day_plan_id: str,
     req: DayPlanUpdate,
+    token: dict = Depends(get_current_user),
     session_service: UserCategorySessionService = Depends(
         UserCategorySessionService),
 ):
-    return await session_service.update_dayplan(session_id, day_plan_id, req)
+    return await session_service.update_dayplan(
+        session_id, day_plan_id, req, token.get("sub")
+    )
 
 
 @user_session_router.get("/compete/{session_id}")
@@ -1,4 +1,7 @@
-from fastapi import Depends, HTTPException, Request
+import hmac
+from typing import Optional
+
+from fastapi import Depends, Header, HTTPException, Request
 from fastapi.security import HTTPAuthorizationCredentials, HTTPBearer
 
 from src.core.settings import settings
@@ -47,3 +50,11 @@ def get_current_user(request: Request, token: str = Depends(JWTBearer())):
     except Exception as e:
         raise HTTPException(
             status_code=403, detail="Invalid token or expired token")
+
+
+def require_metrics_token(token: Optional[str] = Header(None, alias="X-Metrics-Token")):
+    """Internal-only routes: operators pass settings.METRICS_TOKEN."""
+    if not settings.METRICS_TOKEN or not token or not hmac.compare_digest(
+        token, settings.METRICS_TOKEN
+    ):
+        raise HTTPException(status_code=403, detail="Permission denied")
@@ -0,0 +1,44 @@
+from typing import Optional
+
+import httpx
+from openai import AsyncOpenAI
+
+from src.core.settings import settings
+
+llm_client: Optional[AsyncOpenAI] = None
+
+
+def init_llm_client() -> AsyncOpenAI:
+    """Create the process-wide LLM client with a shared, pooled HTTP client."""
+    global llm_client
+    if not settings.OPENAI_API_KEY:
+        raise ValueError("OPENAI_API_KEY не установлен.")
+    http_client = httpx.AsyncClient(
+        http2=settings.LLM_HTTP2,
+        limits=httpx.Limits(
+            max_connections=settings.LLM_MAX_CONNECTIONS,
+            max_keepalive_connections=settings.LLM_MAX_KEEPALIVE_CONNECTIONS,
+            keepalive_expiry=settings.LLM_KEEPALIVE_EXPIRY_SECONDS,
+        ),
+        timeout=httpx.Timeout(settings.LLM_TIMEOUT_SECONDS, connect=10.0),
+    )
+    llm_client = AsyncOpenAI(
+        api_key=settings.OPENAI_API_KEY,
+        base_url=settings.LLM_BASE_URL,
+        timeout=settings.LLM_TIMEOUT_SECONDS,
+        http_client=http_client,
+    )
+    return llm_client
+
+
+async def close_llm_client() -> None:
+    global llm_client
+    if llm_client is not None:
+        await llm_client.close()
+        llm_client = None
+
+
+def get_llm_client() -> AsyncOpenAI:
+    if llm_client is None:
+        raise RuntimeError("LLM client is not initialized.")
+    return llm_client
@@ -1,9 +1,13 @@
 import os
+from typing import Optional
 
 from beanie import init_beanie
 from motor.motor_asyncio import AsyncIOMotorClient
 
+from src.models.cache import WeekScheduleCache
 from src.models.category import Category
+from src.models.jobs import GenerationJob
+from src.models.llm_calls import LLMCallRecord
 from src.models.sessions import DayPlan, UserCategorySession
 from src.models.user import PhysicalData, User
 
@@ -11,12 +15,17 @@ client = None
 db = None
 
 
-async def init_db():
+async def init_db(event_listeners: Optional[list] = None):
     global client, db
-    client = AsyncIOMotorClient(os.getenv("MONGO_URI"))
+    client = AsyncIOMotorClient(
+        os.getenv("MONGO_URI"), event_listeners=event_listeners or []
+    )
     db = client.nutrition
+    # Beanie creates the indexes declared in each model's Settings; creating
+    # an index that already exists is a no-op, so this is safe on every start.
     await init_beanie(
         database=db,
         document_models=[User, PhysicalData,
-                         Category, UserCategorySession, DayPlan],
+                         Category, UserCategorySession, DayPlan,
+                         WeekScheduleCache, GenerationJob, LLMCallRecord],
     )
@@ -8,5 +8,66 @@ class Settings:
     ACCESS_EXPIRE_MINUTES = 60
     REFRESH_EXPIRE_MINUTES = 60 * 24 * 7
 
+    OPENAI_API_KEY = os.getenv("OPENAI_API_KEY")
+    LLM_BASE_URL = os.getenv("LLM_BASE_URL", "https://openrouter.ai/api/v1")
+    LLM_TIMEOUT_SECONDS = float(os.getenv("LLM_TIMEOUT_SECONDS", 360))
+    LLM_HTTP2 = os.getenv("LLM_HTTP2", "false") == "true"
+    LLM_MAX_CONNECTIONS = int(os.getenv("LLM_MAX_CONNECTIONS", 100))
+    LLM_MAX_KEEPALIVE_CONNECTIONS = int(
+        os.getenv("LLM_MAX_KEEPALIVE_CONNECTIONS", 20))
+    LLM_KEEPALIVE_EXPIRY_SECONDS = float(
+        os.getenv("LLM_KEEPALIVE_EXPIRY_SECONDS", 60))
+
+    LLM_STREAMING = os.getenv("LLM_STREAMING", "false") == "true"
+    LLM_STRUCTURED_OUTPUT = os.getenv(
+        "LLM_STRUCTURED_OUTPUT", "false") == "true"
+
+    LLM_MAX_IN_FLIGHT = int(os.getenv("LLM_MAX_IN_FLIGHT", 16))
+    LLM_REQUESTS_PER_MINUTE = int(os.getenv("LLM_REQUESTS_PER_MINUTE", 120))
+    LLM_TOKENS_PER_MINUTE = int(os.getenv("LLM_TOKENS_PER_MINUTE", 400_000))
+    LLM_EXPECTED_COMPLETION_TOKENS = int(
+        os.getenv("LLM_EXPECTED_COMPLETION_TOKENS", 4_000))
+    # JSON object {"model": [input, cached_input, output]} in USD per 1M tokens.
+    LLM_PRICING = os.getenv("LLM_PRICING", "{}")
+
+    # Weekly generation: models in fallback order, primary first.
+    LLM_MODEL_TIERS = os.getenv(
+        "LLM_MODEL_TIERS", "openai/gpt-4o,openai/gpt-4o-mini")
+    LLM_HEDGE_AFTER_SECONDS = float(os.getenv("LLM_HEDGE_AFTER_SECONDS", 90))
+    LLM_BREAKER_FAILURE_THRESHOLD = int(
+        os.getenv("LLM_BREAKER_FAILURE_THRESHOLD", 3))
+    LLM_BREAKER_RESET_SECONDS = float(
+        os.getenv("LLM_BREAKER_RESET_SECONDS", 60))
+
+    WEEK_MAX_ATTEMPTS = int(os.getenv("WEEK_MAX_ATTEMPTS", 3))
+    WEEK_RETRY_BASE_DELAY_SECONDS = float(
+        os.getenv("WEEK_RETRY_BASE_DELAY_SECONDS", 2))
+    WEEK_RETRY_MAX_DELAY_SECONDS = float(
+        os.getenv("WEEK_RETRY_MAX_DELAY_SECONDS", 30))
+
+    SCHEDULE_CACHE_ENABLED = os.getenv("SCHEDULE_CACHE_ENABLED", "true") == "true"
+    SCHEDULE_CACHE_TTL_SECONDS = int(
+        os.getenv("SCHEDULE_CACHE_TTL_SECONDS", 60 * 60 * 24 * 30))
+    SCHEDULE_CACHE_MEMORY_ITEMS = int(
+        os.getenv("SCHEDULE_CACHE_MEMORY_ITEMS", 512))
+    SCHEDULE_CACHE_MAX_DOCUMENTS = int(
+        os.getenv("SCHEDULE_CACHE_MAX_DOCUMENTS", 50_000))
+
+    # Lazy generation: create only the first weeks, extend when the user gets close.
+    LAZY_GENERATION = os.getenv("LAZY_GENERATION", "false") == "true"
+    LAZY_INITIAL_WEEKS = int(os.getenv("LAZY_INITIAL_WEEKS", 4))
+    LAZY_EXTEND_WEEKS = int(os.getenv("LAZY_EXTEND_WEEKS", 4))
+    LAZY_LOOKAHEAD_DAYS = int(os.getenv("LAZY_LOOKAHEAD_DAYS", 7))
+
+    # Shared secret for the process-wide /metrics routes (X-Metrics-Token
+    # header); unset keeps them closed.
+    METRICS_TOKEN = os.getenv("METRICS_TOKEN")
+
+    JOB_LEASE_SECONDS = int(os.getenv("JOB_LEASE_SECONDS", 120))
+    JOB_HEARTBEAT_SECONDS = int(os.getenv("JOB_HEARTBEAT_SECONDS", 30))
+    JOB_POLL_SECONDS = float(os.getenv("JOB_POLL_SECONDS", 2))
+    JOB_MAX_ATTEMPTS = int(os.getenv("JOB_MAX_ATTEMPTS", 3))
+    WORKER_CONCURRENCY = int(os.getenv("WORKER_CONCURRENCY", 4))
+
 
 settings = Settings()
@@ -1,21 +1,19 @@
-import os
-
 from openai import AsyncOpenAI
 
+from src.helpers.llm_metrics import llm_metrics
+
 
 class AI:
 
-    def __init__(self):
-        self.openai = AsyncOpenAI(
-            api_key=os.getenv("OPENAI_API_KEY"),
-            base_url="https://openrouter.ai/api/v1",
-            timeout=360,
-        )
+    def __init__(self, client: AsyncOpenAI):
+        self.openai = client
 
     async def get_response(self, system_message, user_message=None):
-        openai_response = await self.openai.chat.completions.create(
-            model="openai/gpt-4o-mini",
-            messages=[{"role": "system", "content": system_message}],
-        )
+        async with llm_metrics.track("ai_response", "openai/gpt-4o-mini") as call:
+            openai_response = await self.openai.chat.completions.create(
+                model="openai/gpt-4o-mini",
+                messages=[{"role": "system", "content": system_message}],
+            )
+            call.set_usage(openai_response.usage)
 
         return openai_response.choices[0].message.content
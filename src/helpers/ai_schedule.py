@@ -1,34 +1,101 @@
 import asyncio
 import json
-import os
+import random
+from datetime import date
 from logging import getLogger
-from typing import Dict, List, Optional
+from typing import AsyncIterator, Dict, List, Optional, Set, Tuple
 
 from openai import AsyncOpenAI
+from pydantic import ValidationError
 
-from src.helpers.prompts.ai_schedule import (fetch_weekly_schedule_prompt,
+from src.core.settings import settings
+from src.helpers.economy import derive_week
+from src.helpers.json_stream import DayStreamParser, MalformedStreamError
+from src.helpers.llm_governor import estimate_tokens, llm_governor
+from src.helpers.llm_metrics import bind_llm_attribution, llm_metrics
+from src.helpers.llm_policy import weekly_schedule_policy
+from src.helpers.plan_calendar import (DAYS_PER_WEEK, place_day, place_week,
+                                       plan_start_date)
+from src.helpers.progress_analytics import compute_progress_metrics
+from src.helpers.prompts.ai_schedule import (ECONOMY_WEEK_SYSTEM_PROMPT,
+                                             WEEKLY_SCHEDULE_SYSTEM_PROMPT,
+                                             fetch_weekly_schedule_prompt,
                                              get_ai_schedule_prompts)
 from src.helpers.prompts.aI_schedule_analyzer import \
     get_ai_progress_analysis_prompt
+from src.helpers.schedule_cache import schedule_cache, schedule_cache_key
 from src.models.category import Category
-from src.models.sessions import DayPlan, DayStatus, UserCategorySession
+from src.models.sessions import (DayPlan, DayPlanProgress, GenerationMode,
+                                 UserCategorySession)
 from src.models.user import PhysicalData, User
+from src.schemas.ai.schedule import (DayContent, DaySchedule,
+                                     EconomyWeekContent, WeekContent,
+                                     WeekFragment, WeekSchedule)
 
 logger = getLogger(__name__)
 
+WEEK_SCHEDULE_SCHEMA = WeekContent.model_json_schema()
+ECONOMY_WEEK_SCHEMA = EconomyWeekContent.model_json_schema()
+
+
+class WeekGenerationError(Exception):
+    pass
+
+
+def _retry_delay(attempt: int) -> float:
+    """Exponential backoff with +/-50% jitter, capped."""
+    return min(
+        settings.WEEK_RETRY_MAX_DELAY_SECONDS,
+        settings.WEEK_RETRY_BASE_DELAY_SECONDS * 2 ** (attempt - 1),
+    ) * random.uniform(0.5, 1.5)
+
+
+def _week_response_format(name: str, schema: dict) -> dict:
+    """Ask for JSON-schema constrained output when the provider supports it."""
+    if not settings.LLM_STRUCTURED_OUTPUT:
+        return {}
+    return {
+        "response_format": {
+            "type": "json_schema",
+            "json_schema": {"name": name, "schema": schema},
+        }
+    }
+
+
+def week_request_body(prompt: str, model: str, economy: bool = False) -> dict:
+    """Chat completion payload for one week; shared by live and batch generation.
+
+    The system message (and response_format) are identical for every week of
+    every user, so they form the cacheable prefix; `prompt` carries the rest.
+    """
+    if economy:
+        system_prompt = ECONOMY_WEEK_SYSTEM_PROMPT
+        response_format = _week_response_format("economy_week", ECONOMY_WEEK_SCHEMA)
+    else:
+        system_prompt = WEEKLY_SCHEDULE_SYSTEM_PROMPT
+        response_format = _week_response_format("week_schedule", WEEK_SCHEDULE_SCHEMA)
+    return {
+        "model": model,
+        "messages": [
+            {"role": "system", "content": system_prompt},
+            {"role": "user", "content": prompt},
+        ],
+        **response_format,
+    }
+
+
+def plan_weeks(duration: int) -> List[Tuple[int, int]]:
+    """All (month, week) pairs of a plan; plans are capped at 3 months."""
+    return [
+        (month, week)
+        for month in range(1, min(duration, 3) + 1)
+        for week in range(1, 5)
+    ]
+
 
 class AIScheduleGenerator:
-    def __init__(
-        self, api_key: str = None, base_url: str = "https://openrouter.ai/api/v1"
-    ):
-        if api_key is None:
-            api_key = os.environ.get("OPENAI_API_KEY")
-        if not api_key:
-            raise ValueError("OPENAI_API_KEY не установлен.")
-        self.client = AsyncOpenAI(
-            base_url=base_url,
-            api_key=api_key,
-        )
+    def __init__(self, client: AsyncOpenAI):
+        self.client = client
 
     async def analyze_progress(
         self,
@@ -37,32 +104,57 @@ class AIScheduleGenerator:
         category: Category,
         physical_data: PhysicalData,
         weight_after: int,
-        day_plans: List[DayPlan | dict],
+        day_plans: List[DayPlan | DayPlanProgress],
     ) -> Optional[dict]:
-        """Анализирует прогресс пользователя после завершения плана."""
+        """Анализирует прогресс пользователя после завершения плана.
+
+        All numbers are computed locally; the LLM only writes the prose fields.
+        """
         try:
+            metrics = compute_progress_metrics(day_plans, physical_data)
             prompt = await get_ai_progress_analysis_prompt(
-                user_data, category, user, physical_data, weight_after, day_plans
+                user_data, category, user, physical_data, weight_after, metrics
             )
 
-            completion = await self.client.chat.completions.create(
-                model="openai/gpt-4o",
-                messages=[
-                    {
-                        "role": "system",
-                        "content": "You are an AI-powered fitness and nutrition analyst.",
-                    },
-                    {"role": "user", "content": prompt},
-                ],
-            )
+            async with llm_governor.slot(
+                priority=0, estimated_tokens=estimate_tokens(prompt)
+            ) as lease, llm_metrics.track("progress_analysis", "openai/gpt-4o") as call:
+                completion = await self.client.chat.completions.create(
+                    model="openai/gpt-4o",
+                    messages=[
+                        {
+                            "role": "system",
+                            "content": "You are an AI-powered fitness and nutrition analyst.",
+                        },
+                        {"role": "user", "content": prompt},
+                    ],
+                )
+                lease.record_usage(
+                    completion.usage.total_tokens if completion.usage else None
+                )
+                call.set_usage(completion.usage)
 
-            response = completion.choices[0].message.content
-            analysis = json.loads(response)
+                response = completion.choices[0].message.content
+                try:
+                    analysis = json.loads(response)
+                except json.JSONDecodeError as e:
+                    call.parse_failed(e)
+                    raise
+                if not isinstance(analysis, dict):
+                    # Valid JSON but not an object: keep the locally computed
+                    # metrics rather than failing the completion.
+                    call.parse_failed(
+                        ValueError(f"Expected a JSON object, got {type(analysis).__name__}")
+                    )
+                    logger.error("Progress analysis from AI is not a JSON object.")
+                    analysis = {}
+            for section in ("nutrition_analysis", "workout_analysis", "consistency"):
+                analysis[section] = metrics[section]
 
             summary_table = {
                 "Weight Change (kg)": round(weight_after - physical_data.weight, 1),
-                "Total Days Completed": len([day for day in day_plans if day.status == DayStatus.FULL]),
-                "Total Skipped Days": len([day for day in day_plans if day.status == DayStatus.NOT_DONE]),
+                "Total Days Completed": metrics["completed_days"],
+                "Total Skipped Days": metrics["consistency"]["skipped_days"],
             }
 
             user_data.summary_table = summary_table
@@ -85,64 +177,437 @@ class AIScheduleGenerator:
         duration: int,
         month: int,
         week: int,
-    ) -> Optional[str]:
-        """Fetch the schedule for a particular week."""
+        plan_start: Optional[date] = None,
+        progress_note: Optional[str] = None,
+    ) -> Optional[WeekSchedule]:
+        """Fetch and validate the schedule for a particular week."""
+        plan_start = plan_start or plan_start_date()
         try:
-            prompt = await fetch_weekly_schedule_prompt(
-                physical_data, category, goal, comments, duration, month, week
+            cache_key = schedule_cache_key(
+                physical_data, category, goal, comments, duration, month, week,
+                progress_note,
             )
+            cached = await schedule_cache.get(cache_key)
+            if cached is not None:
+                logger.info(f"Schedule cache hit: month {month}, week {week}.")
+                return place_week(cached, plan_start, month, week)
 
-            completion = await self.client.chat.completions.create(
-                model="openai/gpt-4o",
-                messages=[
-                    {"role": "system", "content": "You are a helpful assistant."},
-                    {"role": "user", "content": prompt},
-                ],
+            prompt = await fetch_weekly_schedule_prompt(
+                physical_data, category, goal, comments, duration, month, week,
+                progress_note,
             )
 
-            response = completion.choices[0].message.content
-            json.loads(response)
-            return response
+            async def attempt(model: str, started: asyncio.Event) -> WeekContent:
+                # Weeks queue by their position in the plan, so every session's
+                # first week is served before anyone's later weeks.
+                async with llm_governor.slot(
+                    priority=(month - 1) * 4 + (week - 1),
+                    estimated_tokens=estimate_tokens(WEEKLY_SCHEDULE_SYSTEM_PROMPT + prompt),
+                ) as lease, llm_metrics.track("weekly_schedule", model) as call:
+                    # The hedge timer starts now, not while we were queued.
+                    started.set()
+                    completion = await self.client.chat.completions.create(
+                        **week_request_body(prompt, model)
+                    )
+                    lease.record_usage(
+                        completion.usage.total_tokens if completion.usage else None
+                    )
+                    call.set_usage(completion.usage)
+
+                    # Single pass: pydantic-core parses and validates the raw JSON.
+                    try:
+                        return WeekContent.model_validate_json(
+                            completion.choices[0].message.content or ""
+                        )
+                    except ValidationError as e:
+                        call.parse_failed(e)
+                        raise
 
-        except json.JSONDecodeError as e:
-            logger.error(f"Invalid JSON response from AI: {e}")
+            # Slow calls are hedged and a failing model tier is skipped.
+            content = await weekly_schedule_policy.run(attempt)
+            await schedule_cache.set(cache_key, content)
+            return place_week(content, plan_start, month, week)
+
+        except ValidationError as e:
+            logger.error(
+                f"Invalid week payload from AI (month {month}, week {week}): {e}")
             return None
         except Exception as e:
             logger.error(f"Error generating schedule: {e}")
             raise
 
-    async def generate_full_schedule(
+    async def stream_weekly_schedule(
         self,
         physical_data: PhysicalData,
         category: str,
         goal: str,
         comments: str,
         duration: int,
-    ) -> list:
-        """Generate a complete schedule for all weeks."""
-        schedules = []
+        month: int,
+        week: int,
+        plan_start: Optional[date] = None,
+        progress_note: Optional[str] = None,
+    ) -> AsyncIterator[DaySchedule]:
+        """Streaming variant of fetch_weekly_schedule: yields each day as it closes.
+
+        A malformed day raises MalformedStreamError immediately and closes the
+        upstream stream, so we stop paying for the rest of a broken week.
+        """
+        plan_start = plan_start or plan_start_date()
+        cache_key = schedule_cache_key(
+            physical_data, category, goal, comments, duration, month, week,
+            progress_note,
+        )
+        cached = await schedule_cache.get(cache_key)
+        if cached is not None:
+            logger.info(f"Schedule cache hit: month {month}, week {week}.")
+            for day in place_week(cached, plan_start, month, week).days:
+                yield day
+            return
+
+        prompt = await fetch_weekly_schedule_prompt(
+            physical_data, category, goal, comments, duration, month, week,
+            progress_note,
+        )
+        parser = DayStreamParser(DayContent)
+        days = []
+        async with llm_governor.slot(
+            priority=(month - 1) * 4 + (week - 1),
+            estimated_tokens=estimate_tokens(WEEKLY_SCHEDULE_SYSTEM_PROMPT + prompt),
+        ) as lease, llm_metrics.track(
+            "weekly_schedule", "openai/gpt-4o", streamed=True
+        ) as call:
+            stream = await self.client.chat.completions.create(
+                **week_request_body(prompt, "openai/gpt-4o"),
+                stream=True,
+                stream_options={"include_usage": True},
+            )
+            try:
+                async for chunk in stream:
+                    if chunk.usage:
+                        lease.record_usage(chunk.usage.total_tokens)
+                        call.set_usage(chunk.usage)
+                    if not chunk.choices or not chunk.choices[0].delta.content:
+                        continue
+                    call.mark_first_token()
+                    for day in parser.feed(chunk.choices[0].delta.content):
+                        if len(days) == DAYS_PER_WEEK:
+                            raise MalformedStreamError("More than 7 days in a week")
+                        days.append(day)
+                        yield place_day(day, plan_start, month, week, len(days) - 1)
+                parser.finish()
+                if len(days) != DAYS_PER_WEEK:
+                    raise MalformedStreamError(f"Expected 7 days, got {len(days)}")
+            except MalformedStreamError as e:
+                call.parse_failed(e)
+                raise
+            finally:
+                await stream.close()
+
+        await schedule_cache.set(cache_key, WeekContent(days=days))
+
+    async def stream_weekly_schedule_with_retry(
+        self,
+        physical_data: PhysicalData,
+        category: str,
+        goal: str,
+        comments: str,
+        duration: int,
+        month: int,
+        week: int,
+        plan_start: Optional[date] = None,
+        progress_note: Optional[str] = None,
+    ) -> AsyncIterator[DaySchedule]:
+        """Stream one week's days, retrying with backoff.
+
+        Days already handed out by a failed attempt are not repeated by the retry.
+        """
+        emitted = 0
+        error = None
+        for attempt in range(1, settings.WEEK_MAX_ATTEMPTS + 1):
+            bind_llm_attribution(attempt=attempt)
+            seen = 0
+            try:
+                async for day in self.stream_weekly_schedule(
+                    physical_data, category, goal, comments, duration, month, week,
+                    plan_start=plan_start, progress_note=progress_note,
+                ):
+                    seen += 1
+                    if seen > emitted:
+                        emitted += 1
+                        yield day
+                return
+            except Exception as e:
+                error = str(e)
+
+            if attempt < settings.WEEK_MAX_ATTEMPTS:
+                delay = _retry_delay(attempt)
+                logger.warning(
+                    f"Month {month}, week {week}: attempt {attempt} failed ({error}), retrying in {delay:.1f}s."
+                )
+                await asyncio.sleep(delay)
+
+        raise WeekGenerationError(
+            f"Month {month}, week {week}: giving up after {settings.WEEK_MAX_ATTEMPTS} attempts ({error})."
+        )
+
+    async def fetch_weekly_schedule_with_retry(
+        self,
+        physical_data: PhysicalData,
+        category: str,
+        goal: str,
+        comments: str,
+        duration: int,
+        month: int,
+        week: int,
+        plan_start: Optional[date] = None,
+        progress_note: Optional[str] = None,
+    ) -> Tuple[int, int, Optional[WeekSchedule]]:
+        """Fetch one week, retrying invalid or failed responses with jittered backoff."""
+        week_schedule = await self._with_retry(
+            month, week,
+            lambda: self.fetch_weekly_schedule(
+                physical_data, category, goal, comments, duration, month, week,
+                plan_start=plan_start, progress_note=progress_note,
+            ),
+        )
+        return month, week, week_schedule
+
+    async def _with_retry(self, month: int, week: int, fetch):
+        """Await fetch() until it returns a payload, with jittered backoff; None if it never does."""
+        error = None
+        for attempt in range(1, settings.WEEK_MAX_ATTEMPTS + 1):
+            bind_llm_attribution(attempt=attempt)
+            try:
+                response = await fetch()
+                if response:
+                    return response
+                error = "invalid week payload"
+            except Exception as e:
+                error = str(e)
+
+            if attempt < settings.WEEK_MAX_ATTEMPTS:
+                delay = _retry_delay(attempt)
+                logger.warning(
+                    f"Month {month}, week {week}: attempt {attempt} failed ({error}), retrying in {delay:.1f}s."
+                )
+                await asyncio.sleep(delay)
+
+        logger.error(f"Month {month}, week {week}: giving up after {settings.WEEK_MAX_ATTEMPTS} attempts ({error}).")
+        return None
+
+    async def fetch_economy_base_week(
+        self,
+        physical_data: PhysicalData,
+        category: str,
+        goal: str,
+        comments: str,
+        duration: int,
+        month: int,
+        progress_note: Optional[str] = None,
+    ) -> Optional[EconomyWeekContent]:
+        """Fetch the base week of a month together with its swap alternatives."""
+        try:
+            prompt = await fetch_weekly_schedule_prompt(
+                physical_data, category, goal, comments, duration, month, 1,
+                progress_note,
+            )
+
+            async def attempt(model: str, started: asyncio.Event) -> EconomyWeekContent:
+                async with llm_governor.slot(
+                    priority=(month - 1) * 4,
+                    estimated_tokens=estimate_tokens(ECONOMY_WEEK_SYSTEM_PROMPT + prompt),
+                ) as lease, llm_metrics.track("economy_base_week", model) as call:
+                    started.set()
+                    completion = await self.client.chat.completions.create(
+                        **week_request_body(prompt, model, economy=True)
+                    )
+                    lease.record_usage(
+                        completion.usage.total_tokens if completion.usage else None
+                    )
+                    call.set_usage(completion.usage)
+                    try:
+                        return EconomyWeekContent.model_validate_json(
+                            completion.choices[0].message.content or ""
+                        )
+                    except ValidationError as e:
+                        call.parse_failed(e)
+                        raise
+
+            return await weekly_schedule_policy.run(attempt)
+
+        except ValidationError as e:
+            logger.error(f"Invalid base week payload from AI (month {month}): {e}")
+            return None
+        except Exception as e:
+            logger.error(f"Error generating base week: {e}")
+            raise
+
+    async def _produce_economy_month(
+        self,
+        queue: asyncio.Queue,
+        physical_data: PhysicalData,
+        category: str,
+        goal: str,
+        comments: str,
+        duration: int,
+        month: int,
+        weeks: List[int],
+        plan_start: date,
+        progress_note: Optional[str] = None,
+    ) -> None:
+        """One LLM call for the month's base week; the other weeks are derived."""
+        try:
+            base = await self._with_retry(
+                month, 1,
+                lambda: self.fetch_economy_base_week(
+                    physical_data, category, goal, comments, duration, month, progress_note
+                ),
+            )
+        except Exception as e:
+            logger.error(f"Month {month}, base week: {e}")
+            base = None
+        for week in weeks:
+            if base is None:
+                await queue.put((month, week, [], None))
+                continue
+            week_data = place_week(derive_week(base, week), plan_start, month, week)
+            await queue.put((month, week, week_data.days, True))
+
+    async def _produce_week(
+        self,
+        queue: asyncio.Queue,
+        physical_data: PhysicalData,
+        category: str,
+        goal: str,
+        comments: str,
+        duration: int,
+        month: int,
+        week: int,
+        plan_start: Optional[date] = None,
+        progress_note: Optional[str] = None,
+    ) -> None:
+        """Push (month, week, days, complete) fragments of one week onto the queue.
 
+        complete is None when the week could not be generated at all.
+        """
+        try:
+            if settings.LLM_STREAMING:
+                async for day in self.stream_weekly_schedule_with_retry(
+                    physical_data, category, goal, comments, duration, month, week,
+                    plan_start=plan_start, progress_note=progress_note,
+                ):
+                    await queue.put((month, week, [day], False))
+                await queue.put((month, week, [], True))
+                return
+
+            _, _, week_schedule = await self.fetch_weekly_schedule_with_retry(
+                physical_data, category, goal, comments, duration, month, week,
+                plan_start=plan_start, progress_note=progress_note,
+            )
+            if week_schedule:
+                await queue.put((month, week, week_schedule.days, True))
+            else:
+                await queue.put((month, week, [], None))
+        except Exception as e:
+            logger.error(f"Month {month}, week {week}: {e}")
+            await queue.put((month, week, [], None))
+
+    async def iter_full_schedule(
+        self,
+        physical_data: PhysicalData,
+        category: str,
+        goal: str,
+        comments: str,
+        duration: int,
+        skip_weeks: Optional[Set[Tuple[int, int]]] = None,
+        plan_start: Optional[date] = None,
+        weeks: Optional[List[Tuple[int, int]]] = None,
+        progress_note: Optional[str] = None,
+        mode: GenerationMode = GenerationMode.STANDARD,
+    ) -> AsyncIterator[WeekFragment]:
+        """Yield schedule fragments in the order they arrive from the LLM.
+
+        Without streaming a fragment is a whole week; with LLM_STREAMING every
+        day arrives on its own and a final empty fragment marks the week
+        complete. In economy mode every month costs a single call and its
+        weeks arrive together. Weeks that still fail after retries never
+        complete; callers compare completed weeks against plan_weeks() to find
+        the holes.
+        """
+        queue: asyncio.Queue = asyncio.Queue()
         tasks = []
+        skip_weeks = skip_weeks or set()
+        plan_start = plan_start or plan_start_date()
+        to_generate = [
+            (month, week)
+            for month, week in weeks or plan_weeks(duration)
+            if (month, week) not in skip_weeks
+        ]
 
-        for month in range(1, min(duration, 3) + 1):
-            for week in range(1, 5):
+        if mode == GenerationMode.ECONOMY:
+            months: Dict[int, List[int]] = {}
+            for month, week in to_generate:
+                months.setdefault(month, []).append(week)
+            for month, month_weeks in months.items():
+                logger.info(f"🚀 Generating: month {month} base week (weeks {month_weeks})...")
+                tasks.append(
+                    asyncio.create_task(
+                        self._produce_economy_month(
+                            queue, physical_data, category, goal, comments, duration,
+                            month, month_weeks, plan_start, progress_note,
+                        )
+                    )
+                )
+        else:
+            for month, week in to_generate:
                 logger.info(f"🚀 Generating: month {month}, week {week}...")
                 tasks.append(
-                    self.fetch_weekly_schedule(
-                        physical_data, category, goal, comments, duration, month, week
+                    asyncio.create_task(
+                        self._produce_week(
+                            queue, physical_data, category, goal, comments, duration, month, week,
+                            plan_start=plan_start, progress_note=progress_note,
+                        )
                     )
                 )
-                logger.info(f"🎉 Generated: month {month}, week {week}.")
 
-        week_schedules = await asyncio.gather(*tasks)
-
-        for week_schedule in week_schedules:
-            if week_schedule:
-                print(json.loads(week_schedule))
-                schedules.append(
-                    json.loads(week_schedule)
-                )  # Добавление полученных данных
-            else:
-                logger.warning("Failed to generate schedule for a week.")
+        try:
+            pending = len(to_generate)
+            while pending:
+                # Trust the slot we asked for, not the numbers the model echoed.
+                month, week, days, complete = await queue.get()
+                if complete is None:
+                    pending -= 1
+                    logger.warning(
+                        f"Failed to generate schedule for month {month}, week {week}.")
+                    continue
+                if complete:
+                    pending -= 1
+                    logger.info(f"🎉 Generated: month {month}, week {week}.")
+                yield WeekFragment(month=month, week=week, days=days, complete=complete)
+        finally:
+            # Consumer stopped early or a week failed: don't leave orphaned calls.
+            for task in tasks:
+                task.cancel()
 
-        return schedules
+    async def generate_full_schedule(
+        self,
+        physical_data: PhysicalData,
+        category: str,
+        goal: str,
+        comments: str,
+        duration: int,
+        plan_start: Optional[date] = None,
+        mode: GenerationMode = GenerationMode.STANDARD,
+    ) -> List[WeekSchedule]:
+        """Generate a complete schedule for all weeks."""
+        weeks: Dict[Tuple[int, int], List[DaySchedule]] = {}
+        async for fragment in self.iter_full_schedule(
+            physical_data, category, goal, comments, duration,
+            plan_start=plan_start, mode=mode,
+        ):
+            weeks.setdefault((fragment.month, fragment.week), []).extend(fragment.days)
+        return [
+            WeekSchedule(month=month, week=week, days=days)
+            for (month, week), days in sorted(weeks.items())
+        ]
@@ -0,0 +1,79 @@
+from typing import Dict, List
+
+from src.schemas.ai.schedule import (DayContent, EconomyWeekContent, Exercise,
+                                     Meal, WeekContent)
+
+WEEKS_PER_MONTH = 4
+# Workout volume grows by this share of the base week every week.
+PROGRESSION_PER_WEEK = 0.1
+
+
+def _scale(value: int | str, factor: float) -> int | str:
+    # Free-text values like "30 sec" or "to failure" are kept as they are.
+    if isinstance(value, int) and value > 0:
+        return max(1, round(value * factor))
+    return value
+
+
+def _meal_options(base: EconomyWeekContent) -> Dict[str, List[Meal]]:
+    options: Dict[str, List[Meal]] = {}
+    for meal in base.meal_alternatives:
+        options.setdefault(meal.meal.strip().lower(), []).append(meal)
+    return options
+
+
+def _swap_meal(meal: Meal, options: Dict[str, List[Meal]], turn: int) -> Meal:
+    choices = [meal] + options.get(meal.meal.strip().lower(), [])
+    return choices[turn % len(choices)].model_copy(deep=True)
+
+
+def _progress_exercise(exercise: Exercise, factor: float) -> Exercise:
+    exercise = exercise.model_copy(deep=True)
+    exercise.sets = _scale(exercise.sets, factor)
+    exercise.reps = _scale(exercise.reps, factor)
+    exercise.calories_burned = round(exercise.calories_burned * factor)
+    return exercise
+
+
+def derive_week(base: EconomyWeekContent, week: int) -> WeekContent:
+    """Deterministically derive week `week` (1-4) of a month from its base week.
+
+    - meals rotate across days (Monday of week 2 eats Tuesday's base meals, and
+      so on) and are swapped for the LLM's alternatives in turn;
+    - each weekday keeps its workout slot, so rest days stay rest days, with
+      every other week swapping one exercise per day for an alternative and
+      sets/reps/calories growing by PROGRESSION_PER_WEEK per week;
+    - daily totals are recomputed from the derived meals and exercises.
+    """
+    if week == 1:
+        return WeekContent(days=base.days)
+
+    shift = week - 1
+    factor = 1 + PROGRESSION_PER_WEEK * shift
+    meal_options = _meal_options(base)
+    alternatives = base.exercise_alternatives
+    days = []
+    for index, day in enumerate(base.days):
+        meal_day = base.days[(index + shift) % len(base.days)]
+        meals = [
+            _swap_meal(meal, meal_options, index + shift)
+            for meal in meal_day.meals
+        ]
+
+        workout = list(day.workout)
+        if workout and alternatives and week % 2 == 0:
+            slot = index % len(workout)
+            workout[slot] = alternatives[(index + shift) % len(alternatives)]
+        workout = [_progress_exercise(exercise, factor) for exercise in workout]
+
+        meal_calories = sum(meal.calories for meal in meals)
+        burned = sum(exercise.calories_burned for exercise in workout)
+        days.append(
+            DayContent(
+                meals=meals,
+                workout=workout,
+                total_calories=meal_calories or meal_day.total_calories,
+                total_calories_burned=burned or round(day.total_calories_burned * factor),
+            )
+        )
+    return WeekContent(days=days)
@@ -0,0 +1,84 @@
+from typing import List, Type
+
+from pydantic import BaseModel, ValidationError
+
+
+class MalformedStreamError(ValueError):
+    pass
+
+
+class DayStreamParser:
+    """Incrementally extracts the objects of a top-level "days" array.
+
+    Feed it the completion text chunk by chunk; every day object is returned
+    as soon as its closing brace arrives, long before the whole week is done.
+    """
+
+    def __init__(self, day_model: Type[BaseModel]):
+        self.day_model = day_model
+        self.done = False
+        self._depth = 0
+        self._in_string = False
+        self._escape = False
+        self._token: List[str] = []
+        self._last_string = None
+        self._expect_days = False
+        self._in_days = False
+        self._capturing = False
+        self._current: List[str] = []
+
+    def feed(self, chunk: str) -> List[BaseModel]:
+        days = []
+        for ch in chunk:
+            if self.done:
+                break
+            if self._capturing:
+                self._current.append(ch)
+
+            if self._in_string:
+                if self._escape:
+                    self._escape = False
+                elif ch == "\\":
+                    self._escape = True
+                elif ch == '"':
+                    self._in_string = False
+                    if self._depth == 1:
+                        self._last_string = "".join(self._token)
+                elif self._depth == 1:
+                    self._token.append(ch)
+                continue
+
+            if ch == '"':
+                self._in_string = True
+                self._token = []
+            elif ch == ":":
+                self._expect_days = self._depth == 1 and self._last_string == "days"
+            elif ch in "{[":
+                self._depth += 1
+                if ch == "[" and self._expect_days and self._depth == 2:
+                    self._in_days = True
+                elif ch == "{" and self._in_days and self._depth == 3:
+                    self._capturing = True
+                    self._current = ["{"]
+                self._expect_days = False
+            elif ch in "}]":
+                if ch == "}" and self._capturing and self._depth == 3:
+                    self._capturing = False
+                    days.append(self._parse_day("".join(self._current)))
+                elif ch == "]" and self._in_days and self._depth == 2:
+                    self._in_days = False
+                    self.done = True
+                self._depth -= 1
+            elif not ch.isspace():
+                self._expect_days = False
+        return days
+
+    def finish(self) -> None:
+        if not self.done:
+            raise MalformedStreamError("Stream ended before the days array was closed")
+
+    def _parse_day(self, raw: str) -> BaseModel:
+        try:
+            return self.day_model.model_validate_json(raw)
+        except ValidationError as e:
+            raise MalformedStreamError(f"Invalid day object: {e}") from e
@@ -0,0 +1,196 @@
+import asyncio
+import heapq
+import itertools
+import time
+from collections import deque
+from contextlib import asynccontextmanager
+from dataclasses import dataclass, field
+from logging import getLogger
+from typing import AsyncIterator, Optional
+
+from src.core.settings import settings
+
+logger = getLogger(__name__)
+
+
+class TokenBucket:
+    """Refills `capacity` units per minute, continuously."""
+
+    def __init__(self, capacity_per_minute: float):
+        self.capacity = float(capacity_per_minute)
+        self.rate = self.capacity / 60.0
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+
+    def _refill(self) -> None:
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def wait_time(self, amount: float) -> float:
+        """Seconds until `amount` units are available (0 if available now)."""
+        self._refill()
+        # A single request larger than the whole bucket would never fit.
+        amount = min(amount, self.capacity)
+        if self.tokens >= amount:
+            return 0.0
+        return (amount - self.tokens) / self.rate
+
+    def take(self, amount: float) -> None:
+        self._refill()
+        self.tokens -= min(amount, self.capacity)
+
+    def adjust(self, delta: float) -> None:
+        """Correct an earlier estimate once the real cost is known."""
+        self._refill()
+        self.tokens = min(self.capacity, self.tokens - delta)
+
+
+@dataclass(order=True)
+class _Waiter:
+    priority: int
+    seq: int
+    tokens: int = field(compare=False)
+    future: asyncio.Future = field(compare=False)
+    enqueued_at: float = field(compare=False)
+
+
+class LLMLease:
+    def __init__(self, governor: "LLMGovernor", estimated_tokens: int):
+        self._governor = governor
+        self._estimated_tokens = estimated_tokens
+
+    def record_usage(self, total_tokens: Optional[int]) -> None:
+        if total_tokens is not None:
+            self._governor.settle_tokens(self._estimated_tokens, total_tokens)
+            self._estimated_tokens = total_tokens
+
+
+class LLMGovernor:
+    """Process-wide gate in front of the LLM provider.
+
+    Requests wait in a priority queue ordered by (priority, arrival), where
+    priority is the week's position inside its session. Week 1 of every
+    session is therefore dispatched before week 12 of any session. A request
+    leaves the queue only while the in-flight cap and both token buckets
+    (requests/min, tokens/min) allow it.
+    """
+
+    def __init__(
+        self,
+        max_in_flight: int = settings.LLM_MAX_IN_FLIGHT,
+        requests_per_minute: int = settings.LLM_REQUESTS_PER_MINUTE,
+        tokens_per_minute: int = settings.LLM_TOKENS_PER_MINUTE,
+    ):
+        self.max_in_flight = max_in_flight
+        self._requests = TokenBucket(requests_per_minute)
+        self._tokens = TokenBucket(tokens_per_minute)
+        self._queue: list[_Waiter] = []
+        self._seq = itertools.count()
+        self._in_flight = 0
+        self._wakeup: Optional[asyncio.TimerHandle] = None
+        self._served = 0
+        self._wait_times = deque(maxlen=1000)
+
+    @asynccontextmanager
+    async def slot(self, priority: int = 0, estimated_tokens: int = 0) -> AsyncIterator[LLMLease]:
+        loop = asyncio.get_running_loop()
+        waiter = _Waiter(
+            priority=priority,
+            seq=next(self._seq),
+            tokens=estimated_tokens,
+            future=loop.create_future(),
+            enqueued_at=time.monotonic(),
+        )
+        heapq.heappush(self._queue, waiter)
+        self._dispatch()
+        try:
+            await waiter.future
+        except asyncio.CancelledError:
+            if waiter.future.done() and not waiter.future.cancelled():
+                self._release()
+            raise
+
+        wait = time.monotonic() - waiter.enqueued_at
+        self._wait_times.append(wait)
+        self._served += 1
+        if wait > 1:
+            logger.info(f"LLM request waited {wait:.1f}s in queue (priority {priority}).")
+        try:
+            yield LLMLease(self, estimated_tokens)
+        finally:
+            self._release()
+
+    def settle_tokens(self, estimated: int, actual: int) -> None:
+        """Correct the token budget once a request's real usage is known."""
+        self._tokens.adjust(actual - estimated)
+
+    def _release(self) -> None:
+        self._in_flight -= 1
+        self._dispatch()
+
+    def _dispatch(self) -> None:
+        while self._queue and self._in_flight < self.max_in_flight:
+            waiter = self._queue[0]
+            if waiter.future.done():
+                heapq.heappop(self._queue)
+                continue
+            wait = max(
+                self._requests.wait_time(1), self._tokens.wait_time(waiter.tokens)
+            )
+            if wait > 0:
+                self._schedule_wakeup(wait)
+                return
+            heapq.heappop(self._queue)
+            self._requests.take(1)
+            self._tokens.take(waiter.tokens)
+            self._in_flight += 1
+            waiter.future.set_result(None)
+
+    def _schedule_wakeup(self, delay: float) -> None:
+        loop = asyncio.get_running_loop()
+        when = loop.time() + delay
+        if self._wakeup is not None and not self._wakeup.cancelled():
+            if self._wakeup.when() <= when:
+                return
+            self._wakeup.cancel()
+        self._wakeup = loop.call_at(when, self._on_wakeup)
+
+    def _on_wakeup(self) -> None:
+        self._wakeup = None
+        self._dispatch()
+
+    def get_metrics(self) -> dict:
+        waiting = [w for w in self._queue if not w.future.done()]
+        wait_times = sorted(self._wait_times)
+
+        def percentile(p: float) -> float:
+            if not wait_times:
+                return 0.0
+            return round(wait_times[min(len(wait_times) - 1, int(len(wait_times) * p))], 3)
+
+        depth_by_priority = {}
+        for w in waiting:
+            depth_by_priority[w.priority] = depth_by_priority.get(w.priority, 0) + 1
+        return {
+            "queue_depth": len(waiting),
+            "queue_depth_by_priority": depth_by_priority,
+            "in_flight": self._in_flight,
+            "max_in_flight": self.max_in_flight,
+            "served": self._served,
+            "wait_seconds": {
+                "p50": percentile(0.5),
+                "p95": percentile(0.95),
+                "max": round(wait_times[-1], 3) if wait_times else 0.0,
+            },
+            "requests_available": round(self._requests.tokens, 1),
+            "tokens_available": round(self._tokens.tokens),
+        }
+
+
+def estimate_tokens(prompt: str, expected_completion: int = settings.LLM_EXPECTED_COMPLETION_TOKENS) -> int:
+    # ~4 characters per token is close enough for budgeting.
+    return len(prompt) // 4 + expected_completion
+
+
+llm_governor = LLMGovernor()
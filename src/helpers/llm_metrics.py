@@ -0,0 +1,221 @@
+import asyncio
+import bisect
+import json
+import time
+from contextlib import asynccontextmanager
+from contextvars import ContextVar
+from logging import getLogger
+from typing import AsyncIterator, Dict
+
+from fastapi import Request
+
+from src.core.settings import settings
+from src.models.llm_calls import LLMCallRecord
+
+logger = getLogger(__name__)
+
+# USD per 1M tokens: (input, cached input, output).
+MODEL_PRICING = {
+    "openai/gpt-4o": (2.50, 1.25, 10.00),
+    "openai/gpt-4o-mini": (0.15, 0.075, 0.60),
+    **{model: tuple(prices) for model, prices in json.loads(settings.LLM_PRICING).items()},
+}
+
+LATENCY_BUCKETS_MS = [250, 500, 1_000, 2_000, 5_000, 10_000, 20_000, 30_000, 60_000, 120_000]
+TOKEN_BUCKETS = [100, 250, 500, 1_000, 2_000, 4_000, 8_000, 16_000]
+
+# Who an LLM call is made for. Set once per request / job / retry attempt;
+# tasks spawned afterwards inherit it.
+llm_attribution: ContextVar[Dict] = ContextVar("llm_attribution", default={})
+
+
+def bind_llm_attribution(**fields) -> None:
+    llm_attribution.set({**llm_attribution.get(), **fields})
+
+
+async def bind_route_attribution(request: Request) -> None:
+    """Router dependency: attribute LLM calls made by a request to its route."""
+    route = request.scope.get("route")
+    bind_llm_attribution(route=getattr(route, "path", request.url.path))
+
+
+def estimate_cost(model: str, prompt_tokens: int, completion_tokens: int, cached_tokens: int) -> float:
+    input_price, cached_price, output_price = MODEL_PRICING.get(model, (0, 0, 0))
+    return (
+        (prompt_tokens - cached_tokens) * input_price
+        + cached_tokens * cached_price
+        + completion_tokens * output_price
+    ) / 1_000_000
+
+
+def cache_hit_ratio(prompt_tokens: int, cached_tokens: int) -> float:
+    """Share of prompt tokens the provider served from its prefix cache."""
+    return round(cached_tokens / prompt_tokens, 4) if prompt_tokens else 0.0
+
+
+class Histogram:
+    def __init__(self, buckets):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.total = 0.0
+        self.count = 0
+
+    def observe(self, value: float) -> None:
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.total += value
+        self.count += 1
+
+    def to_dict(self) -> Dict:
+        labels = [f"le_{b}" for b in self.buckets] + ["le_inf"]
+        return {
+            "buckets": dict(zip(labels, self.counts)),
+            "count": self.count,
+            "avg": round(self.total / self.count, 1) if self.count else 0,
+        }
+
+
+class _Aggregate:
+    def __init__(self):
+        self.calls = 0
+        self.errors = 0
+        self.parse_failures = 0
+        self.retries = 0
+        self.prompt_tokens = 0
+        self.completion_tokens = 0
+        self.cached_tokens = 0
+        self.cost_usd = 0.0
+        self.latency_ms = Histogram(LATENCY_BUCKETS_MS)
+        self.completion_tokens_hist = Histogram(TOKEN_BUCKETS)
+
+    def add(self, record: LLMCallRecord) -> None:
+        self.calls += 1
+        self.errors += record.status == "error"
+        self.parse_failures += record.status == "parse_error"
+        self.retries += record.attempt > 1
+        self.prompt_tokens += record.prompt_tokens
+        self.completion_tokens += record.completion_tokens
+        self.cached_tokens += record.cached_tokens
+        self.cost_usd += record.cost_usd
+        self.latency_ms.observe(record.latency_ms)
+        self.completion_tokens_hist.observe(record.completion_tokens)
+
+    def to_dict(self) -> Dict:
+        return {
+            "calls": self.calls,
+            "errors": self.errors,
+            "parse_failures": self.parse_failures,
+            "retries": self.retries,
+            "prompt_tokens": self.prompt_tokens,
+            "completion_tokens": self.completion_tokens,
+            "cached_tokens": self.cached_tokens,
+            "cache_hit_ratio": cache_hit_ratio(self.prompt_tokens, self.cached_tokens),
+            "cost_usd": round(self.cost_usd, 4),
+            "latency_ms": self.latency_ms.to_dict(),
+            "completion_tokens_histogram": self.completion_tokens_hist.to_dict(),
+        }
+
+
+class LLMCall:
+    """Measurements of one chat completion, filled in by the caller."""
+
+    def __init__(self, operation: str, model: str, streamed: bool):
+        self.record = LLMCallRecord(
+            operation=operation, model=model, streamed=streamed, **llm_attribution.get()
+        )
+        self._started = time.perf_counter()
+
+    def set_usage(self, usage) -> None:
+        if usage is None:
+            return
+        self.record.prompt_tokens = usage.prompt_tokens or 0
+        self.record.completion_tokens = usage.completion_tokens or 0
+        details = getattr(usage, "prompt_tokens_details", None)
+        self.record.cached_tokens = (getattr(details, "cached_tokens", None) or 0) if details else 0
+
+    def elapsed_ms(self) -> float:
+        return (time.perf_counter() - self._started) * 1000
+
+    def mark_first_token(self) -> None:
+        if self.record.time_to_first_token_ms is None:
+            self.record.time_to_first_token_ms = self.elapsed_ms()
+
+    def parse_failed(self, error: Exception) -> None:
+        self.record.status = "parse_error"
+        self.record.error = str(error)[:500]
+
+
+class LLMMetrics:
+    """Per-call records in Mongo plus in-process aggregates per operation and route."""
+
+    def __init__(self):
+        self._by_operation: Dict[str, _Aggregate] = {}
+        self._by_route: Dict[str, _Aggregate] = {}
+
+    @asynccontextmanager
+    async def track(self, operation: str, model: str, streamed: bool = False) -> AsyncIterator[LLMCall]:
+        call = LLMCall(operation, model, streamed)
+        try:
+            yield call
+        except asyncio.CancelledError:
+            # Hedge losers and aborted generations are not provider errors.
+            call.record.status = "cancelled"
+            raise
+        except BaseException as e:
+            if call.record.status == "ok":
+                call.record.status = "error"
+                call.record.error = (str(e) or type(e).__name__)[:500]
+            raise
+        finally:
+            await self._finish(call)
+
+    async def _finish(self, call: LLMCall) -> None:
+        record = call.record
+        record.latency_ms = round(call.elapsed_ms(), 1)
+        record.cost_usd = estimate_cost(
+            record.model, record.prompt_tokens, record.completion_tokens, record.cached_tokens
+        )
+        key = f"{record.operation}:{record.model}"
+        self._by_operation.setdefault(key, _Aggregate()).add(record)
+        self._by_route.setdefault(record.route or "unknown", _Aggregate()).add(record)
+        logger.info(
+            f"LLM {record.operation} {record.model} {record.status}: {record.latency_ms:.0f}ms, "
+            f"{record.prompt_tokens}+{record.completion_tokens} tokens "
+            f"({record.cached_tokens} cached), ${record.cost_usd:.4f}"
+        )
+        try:
+            await record.insert()
+        except Exception as e:
+            logger.warning(f"Failed to store LLM call record: {e}")
+
+    def snapshot(self) -> Dict:
+        return {
+            "by_operation": {key: agg.to_dict() for key, agg in self._by_operation.items()},
+            "by_route": {key: agg.to_dict() for key, agg in self._by_route.items()},
+        }
+
+    async def session_summary(self, session_id: str) -> Dict:
+        pipeline = [
+            {"$match": {"session_id": session_id}},
+            {
+                "$group": {
+                    "_id": "$operation",
+                    "calls": {"$sum": 1},
+                    "errors": {"$sum": {"$cond": [{"$eq": ["$status", "error"]}, 1, 0]}},
+                    "parse_failures": {"$sum": {"$cond": [{"$eq": ["$status", "parse_error"]}, 1, 0]}},
+                    "retries": {"$sum": {"$cond": [{"$gt": ["$attempt", 1]}, 1, 0]}},
+                    "prompt_tokens": {"$sum": "$prompt_tokens"},
+                    "completion_tokens": {"$sum": "$completion_tokens"},
+                    "cached_tokens": {"$sum": "$cached_tokens"},
+                    "cost_usd": {"$sum": "$cost_usd"},
+                    "avg_latency_ms": {"$avg": "$latency_ms"},
+                    "max_latency_ms": {"$max": "$latency_ms"},
+                }
+            },
+        ]
+        rows = await LLMCallRecord.aggregate(pipeline).to_list()
+        for row in rows:
+            row["cache_hit_ratio"] = cache_hit_ratio(row["prompt_tokens"], row["cached_tokens"])
+        return {row.pop("_id"): row for row in rows}
+
+
+llm_metrics = LLMMetrics()
@@ -0,0 +1,194 @@
+import asyncio
+import time
+from logging import getLogger
+from typing import Awaitable, Callable, Dict, List, Optional, TypeVar
+
+from openai import APIError
+
+from src.core.settings import settings
+
+logger = getLogger(__name__)
+
+T = TypeVar("T")
+
+# Only provider/network failures count against a model; a response that
+# fails validation is the model's answer, not an outage.
+UPSTREAM_ERRORS = (APIError, asyncio.TimeoutError)
+
+
+class CircuitBreaker:
+    """Opens after `failure_threshold` consecutive upstream errors.
+
+    While open the model is skipped; after `reset_seconds` a single probe
+    request is let through (half-open) and its outcome closes or re-opens it.
+    """
+
+    def __init__(self, failure_threshold: int, reset_seconds: float):
+        self.failure_threshold = failure_threshold
+        self.reset_seconds = reset_seconds
+        self.failures = 0
+        self.opened_at: Optional[float] = None
+        self._probing = False
+
+    @property
+    def state(self) -> str:
+        if self.opened_at is None:
+            return "closed"
+        if time.monotonic() - self.opened_at >= self.reset_seconds:
+            return "half_open"
+        return "open"
+
+    def allow(self) -> bool:
+        state = self.state
+        if state == "closed":
+            return True
+        if state == "half_open" and not self._probing:
+            self._probing = True
+            return True
+        return False
+
+    def record_success(self) -> None:
+        self.failures = 0
+        self.opened_at = None
+        self._probing = False
+
+    def release_probe(self) -> None:
+        self._probing = False
+
+    def record_failure(self) -> None:
+        self.failures += 1
+        if self._probing or self.failures >= self.failure_threshold:
+            self.opened_at = time.monotonic()
+        self._probing = False
+
+
+class LLMCallPolicy:
+    """Hedging and tiered model fallback for non-streamed completions.
+
+    `run(attempt)` calls `attempt(model, started)` on the first tier whose
+    breaker is closed. `started` is an asyncio.Event the attempt sets once it
+    holds its governor slot, i.e. once the request is really in flight. If it
+    has not returned `hedge_after` seconds after that, a second identical
+    request is fired; the first one to return a valid result wins and the
+    other is cancelled. Time spent queued in the governor never triggers a
+    hedge, so a backed-up queue is not doubled.
+    """
+
+    def __init__(
+        self,
+        tiers: List[str],
+        hedge_after: float,
+        failure_threshold: int,
+        reset_seconds: float,
+    ):
+        self.tiers = tiers
+        self.hedge_after = hedge_after
+        self._breakers = {
+            model: CircuitBreaker(failure_threshold, reset_seconds) for model in tiers
+        }
+        self._calls = 0
+        self._hedges_fired = 0
+        self._hedges_won = 0
+        self._fallbacks = 0
+        self._by_model: Dict[str, int] = {}
+
+    def select_model(self) -> str:
+        for model in self.tiers:
+            if self._breakers[model].allow():
+                return model
+        # Every tier is open: keep trying the cheapest one rather than fail outright.
+        return self.tiers[-1]
+
+    async def run(self, attempt: Callable[[str, asyncio.Event], Awaitable[T]]) -> T:
+        model = self.select_model()
+        self._calls += 1
+        self._by_model[model] = self._by_model.get(model, 0) + 1
+        if model != self.tiers[0]:
+            self._fallbacks += 1
+            logger.info(f"LLM fallback: using {model} instead of {self.tiers[0]}.")
+
+        breaker = self._breakers[model]
+        try:
+            result = await self._hedged(attempt, model)
+        except UPSTREAM_ERRORS:
+            breaker.record_failure()
+            if breaker.state == "open":
+                logger.warning(f"Circuit opened for {model} after {breaker.failures} errors.")
+            raise
+        except Exception:
+            # The provider answered, just not with a usable payload.
+            breaker.record_success()
+            raise
+        except BaseException:
+            breaker.release_probe()
+            raise
+        breaker.record_success()
+        return result
+
+    async def _hedged(
+        self, attempt: Callable[[str, asyncio.Event], Awaitable[T]], model: str
+    ) -> T:
+        started = asyncio.Event()
+        primary = asyncio.ensure_future(attempt(model, started))
+        pending = {primary}
+        try:
+            if self.hedge_after > 0:
+                slot_taken = asyncio.ensure_future(started.wait())
+                try:
+                    await asyncio.wait(
+                        {primary, slot_taken}, return_when=asyncio.FIRST_COMPLETED
+                    )
+                finally:
+                    slot_taken.cancel()
+                if not primary.done():
+                    await asyncio.wait(pending, timeout=self.hedge_after)
+                if primary.done():
+                    pending = set()
+                    return primary.result()
+                self._hedges_fired += 1
+                logger.info(
+                    f"LLM hedge: {model} exceeded {self.hedge_after:.0f}s, firing a second request.")
+                hedge = asyncio.ensure_future(attempt(model, asyncio.Event()))
+                pending = {primary, hedge}
+            else:
+                hedge = None
+
+            error: Optional[BaseException] = None
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    if task.exception() is None:
+                        if task is hedge:
+                            self._hedges_won += 1
+                        return task.result()
+                    error = task.exception()
+            raise error
+        finally:
+            for task in pending:
+                task.cancel()
+            if pending:
+                await asyncio.gather(*pending, return_exceptions=True)
+
+    def get_metrics(self) -> Dict:
+        return {
+            "calls": self._calls,
+            "hedge_after_seconds": self.hedge_after,
+            "hedges_fired": self._hedges_fired,
+            "hedges_won": self._hedges_won,
+            "hedge_rate": round(self._hedges_fired / self._calls, 4) if self._calls else 0,
+            "fallbacks": self._fallbacks,
+            "fallback_rate": round(self._fallbacks / self._calls, 4) if self._calls else 0,
+            "calls_by_model": dict(self._by_model),
+            "breakers": {
+                model: {"state": breaker.state, "consecutive_failures": breaker.failures}
+                for model, breaker in self._breakers.items()
+            },
+        }
+
+
+weekly_schedule_policy = LLMCallPolicy(
+    tiers=[model.strip() for model in settings.LLM_MODEL_TIERS.split(",") if model.strip()],
+    hedge_after=settings.LLM_HEDGE_AFTER_SECONDS,
+    failure_threshold=settings.LLM_BREAKER_FAILURE_THRESHOLD,
+    reset_seconds=settings.LLM_BREAKER_RESET_SECONDS,
+)
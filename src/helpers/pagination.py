@@ -0,0 +1,45 @@
+import base64
+import datetime
+import json
+from typing import Any, List, Tuple
+
+from bson import ObjectId
+from fastapi import HTTPException
+
+NEXT = "next"
+PREV = "prev"
+
+
+def encode_cursor(direction: str, value: Any, id: ObjectId) -> str:
+    """Opaque keyset cursor: the (sort value, _id) of a page's edge item."""
+    if isinstance(value, datetime.datetime):
+        value = {"$date": value.isoformat()}
+    raw = json.dumps({"d": direction, "v": value, "i": str(id)}, separators=(",", ":"))
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> Tuple[str, Any, ObjectId]:
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        data = json.loads(raw)
+        value = data["v"]
+        if isinstance(value, dict):
+            value = datetime.datetime.fromisoformat(value["$date"])
+        if data["d"] not in (NEXT, PREV):
+            raise ValueError(data["d"])
+        return data["d"], value, ObjectId(data["i"])
+    except Exception:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+
+def keyset_filter(field: str, direction: str, value: Any, id: ObjectId, descending: bool = False) -> dict:
+    """Documents strictly after (or before) (value, id) in (field, _id) order."""
+    forward = direction == NEXT
+    op = "$gt" if forward != descending else "$lt"
+    return {"$or": [{field: {op: value}}, {field: value, "_id": {op: id}}]}
+
+
+def keyset_sort(field: str, direction: str, descending: bool = False) -> List[Tuple[str, int]]:
+    """Sort that walks away from the cursor; PREV pages come back reversed."""
+    order = -1 if (direction == NEXT) == descending else 1
+    return [(field, order), ("_id", order)]
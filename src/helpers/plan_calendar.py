@@ -0,0 +1,44 @@
+from datetime import date, datetime, timedelta
+from typing import Optional
+
+from src.schemas.ai.schedule import DayContent, DaySchedule, WeekContent, WeekSchedule
+
+DAYS_PER_WEEK = 7
+WEEKS_PER_MONTH = 4
+
+
+def plan_start_date(session_start: Optional[datetime] = None) -> date:
+    """Plans start on the first Monday on or after the session was created."""
+    start = (session_start or datetime.utcnow()).date()
+    return start + timedelta(days=(7 - start.weekday()) % 7)
+
+
+def week_offset(month: int, week: int) -> int:
+    return (month - 1) * WEEKS_PER_MONTH + (week - 1)
+
+
+def place_day(
+    day: DayContent, plan_start: date, month: int, week: int, index: int
+) -> DaySchedule:
+    """Put the `index`-th generated day of (month, week) on the plan calendar."""
+    day_number = week_offset(month, week) * DAYS_PER_WEEK + index + 1
+    day_date = plan_start + timedelta(days=day_number - 1)
+    return DaySchedule(
+        date=day_date,
+        day_number=day_number,
+        day_of_week=day_date.strftime("%A"),
+        **day.model_dump(),
+    )
+
+
+def place_week(
+    content: WeekContent, plan_start: date, month: int, week: int
+) -> WeekSchedule:
+    return WeekSchedule(
+        month=month,
+        week=week,
+        days=[
+            place_day(day, plan_start, month, week, index)
+            for index, day in enumerate(content.days)
+        ],
+    )
@@ -0,0 +1,175 @@
+import datetime
+from typing import Dict, List, Optional
+
+import numpy as np
+
+from src.models.sessions import DayStatus
+from src.models.user import PhysicalData
+
+# How much of a day counts as followed.
+STATUS_SCORES = {
+    DayStatus.FULL: 1.0,
+    DayStatus.PARTIAL: 0.5,
+    DayStatus.NOT_DONE: 0.0,
+}
+
+ACTIVITY_MULTIPLIERS = {
+    "sedentary": 1.2,
+    "low": 1.375,
+    "light": 1.375,
+    "moderate": 1.55,
+    "medium": 1.55,
+    "active": 1.725,
+    "high": 1.725,
+    "very active": 1.9,
+}
+
+# Net intake within this share of maintenance counts as "stable".
+STABLE_BAND = 0.05
+TOP_EXERCISES = 3
+
+
+def estimate_maintenance_calories(physical_data: PhysicalData) -> Optional[float]:
+    """Mifflin-St Jeor BMR scaled by activity level."""
+    if not physical_data.weight or not physical_data.height or not physical_data.age:
+        return None
+    bmr = 10 * physical_data.weight + 6.25 * physical_data.height - 5 * physical_data.age
+    gender = (physical_data.gender or "").strip().lower()
+    if gender in ("male", "m", "man"):
+        bmr += 5
+    elif gender in ("female", "f", "woman"):
+        bmr -= 161
+    else:
+        bmr -= 78
+    activity = (physical_data.activity_level or "").strip().lower()
+    return bmr * ACTIVITY_MULTIPLIERS.get(activity, 1.375)
+
+
+def _longest_run(mask: np.ndarray) -> int:
+    if not mask.any():
+        return 0
+    edges = np.diff(np.concatenate(([0], mask.astype(np.int8), [0])))
+    starts = np.flatnonzero(edges == 1)
+    ends = np.flatnonzero(edges == -1)
+    return int((ends - starts).max())
+
+
+def compute_progress_metrics(day_plans: List, physical_data: PhysicalData) -> Dict:
+    """Every numeric field of the progress analysis, computed from DayPlans.
+
+    Partial days count as half a day for calories burned and weekly adherence,
+    and as followed for streaks and workout days.
+    """
+    day_plans = sorted(day_plans, key=lambda day: day.date)
+    n = len(day_plans)
+    scores = np.fromiter((STATUS_SCORES[DayStatus(day.status)] for day in day_plans), float, n)
+    calories = np.fromiter((day.total_calories or 0 for day in day_plans), float, n)
+    burned = np.fromiter((day.total_calories_burned or 0 for day in day_plans), float, n)
+    has_workout = np.fromiter((bool(day.workout) for day in day_plans), bool, n)
+    followed = scores > 0
+    week_numbers = np.fromiter(
+        (
+            (int(day.month) - 1) * 4 + int(day.week)
+            if day.month is not None and day.week is not None
+            else index // 7 + 1
+            for index, day in enumerate(day_plans)
+        ),
+        int,
+        n,
+    )
+
+    intake_days = calories[followed] if followed.any() else calories
+    average_calories = float(intake_days.mean()) if intake_days.size else 0.0
+    average_burned = float(burned[followed].mean()) if followed.any() else 0.0
+
+    calorie_trend = "stable"
+    maintenance = estimate_maintenance_calories(physical_data)
+    if maintenance and intake_days.size:
+        balance = (average_calories - average_burned - maintenance) / maintenance
+        if balance < -STABLE_BAND:
+            calorie_trend = "deficit"
+        elif balance > STABLE_BAND:
+            calorie_trend = "surplus"
+
+    exercise_names = [
+        workout.exercise.strip().title()
+        for day, is_followed in zip(day_plans, followed)
+        if is_followed
+        for workout in day.workout
+        if workout.exercise.strip()
+    ]
+    most_frequent = []
+    if exercise_names:
+        names, counts = np.unique(np.array(exercise_names), return_counts=True)
+        # Stable order for ties: most frequent first, then alphabetical.
+        order = np.lexsort((names, -counts))[:TOP_EXERCISES]
+        most_frequent = [str(name) for name in names[order]]
+
+    best_week = worst_week = None
+    weekly_adherence = {}
+    if n:
+        weeks, week_index = np.unique(week_numbers, return_inverse=True)
+        adherence = np.bincount(week_index, weights=scores) / np.bincount(week_index)
+        weekly_adherence = {
+            f"Week {week}": round(float(value) * 100, 1)
+            for week, value in zip(weeks, adherence)
+        }
+        best_week = f"Week {weeks[int(np.argmax(adherence))]}"
+        worst_week = f"Week {weeks[int(np.argmin(adherence))]}"
+
+    return {
+        "total_days": n,
+        "nutrition_analysis": {
+            "average_calories_per_day": int(round(average_calories)),
+            "calorie_trend": calorie_trend,
+        },
+        "workout_analysis": {
+            "total_workout_days": int((followed & has_workout).sum()),
+            "most_frequent_exercises": most_frequent,
+            "total_calories_burned": int(round(float((burned * scores).sum()))),
+        },
+        "consistency": {
+            "longest_streak_days": _longest_run(followed),
+            "skipped_days": int((scores == 0).sum()),
+            "best_week": best_week,
+            "worst_week": worst_week,
+        },
+        "completed_days": int((scores == 1).sum()),
+        "partial_days": int((scores == 0.5).sum()),
+        "weekly_adherence_percent": weekly_adherence,
+        "maintenance_calories_estimate": int(round(maintenance)) if maintenance else None,
+    }
+
+
+# Below this many elapsed days there is no signal worth sending to the LLM.
+MIN_OBSERVED_DAYS = 3
+ADHERENCE_BUCKET_PERCENT = 10
+
+
+def adherence_note(
+    day_plans: List, physical_data: PhysicalData, today: datetime.date
+) -> Optional[str]:
+    """Short summary of how the user followed the days that already passed.
+
+    Numbers are bucketed so users with similar adherence share prompts (and
+    schedule cache entries).
+    """
+    elapsed = [day for day in day_plans if day.date.date() < today]
+    if len(elapsed) < MIN_OBSERVED_DAYS:
+        return None
+    metrics = compute_progress_metrics(elapsed, physical_data)
+    scores = np.fromiter((STATUS_SCORES[DayStatus(day.status)] for day in elapsed), float, len(elapsed))
+    adherence = int(scores.mean() * 100 // ADHERENCE_BUCKET_PERCENT * ADHERENCE_BUCKET_PERCENT)
+
+    if adherence < 50:
+        guidance = "Adherence is low: make the plan simpler and easier to follow, with shorter workouts and familiar meals."
+    elif adherence < 80:
+        guidance = "Adherence is moderate: keep the difficulty about the same and favour what the user has been doing."
+    else:
+        guidance = "Adherence is high: progress intensity gradually."
+    lines = [f"- About {adherence}% of the planned days so far were followed."]
+    exercises = metrics["workout_analysis"]["most_frequent_exercises"]
+    if exercises:
+        lines.append(f"- Exercises the user actually does most: {', '.join(exercises)}.")
+    lines.append(f"- {guidance}")
+    return "\n".join(lines)
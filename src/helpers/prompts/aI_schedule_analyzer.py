@@ -1,5 +1,7 @@
+import json
+
 from src.models.category import Category
-from src.models.sessions import DayPlan, UserCategorySession
+from src.models.sessions import UserCategorySession
 from src.models.user import PhysicalData, User
 
 
@@ -9,7 +11,7 @@ async def get_ai_progress_analysis_prompt(
     user: User,
     physical_data: PhysicalData,
     weight_after: int,
-    day_plans,
+    metrics: dict,
 ) -> str:
     prompt = f"""
 You are an AI-powered fitness and nutrition analyst. Your task is to analyze the entire fitness and nutrition plan of a user, assess their progress, and provide structured insights.
@@ -21,46 +23,31 @@ You are an AI-powered fitness and nutrition analyst. Your task is to analyze the
 - **Final Weight:** {weight_after} kg
 - **Target Weight:** Extract target weight from the goal statement.
 
-USER COMPLETED PLAN:
-- **Total Days:** {len(day_plans)}
-- **All Day Plans:** {day_plans}
+## PLAN STATISTICS (computed exactly from the user's daily records):
+{json.dumps(metrics, ensure_ascii=False)}
+
+These numbers are final: do not recompute or contradict them, refer to them in your text.
 
 ## ANALYSIS REQUIREMENTS:
-Your analysis should be **comprehensive and data-driven**. Ensure accuracy and logical consistency in the assessment.
+Your analysis should be **comprehensive and data-driven**. Ensure logical consistency with the statistics above.
 
 ### 1. Goal Achievement
 - Did the user achieve their goal? If yes, state it clearly.
 - If not, how much progress was made? Provide exact numbers and percentages.
 - Calculate **total weight lost** and **progress percentage** relative to the goal.
 
-### 2. Nutrition Analysis
-- Compute **average daily calorie intake** over the entire period.
-- Compare planned vs. actual calorie intake (if historical data is available).
-- Identify dietary patterns: Was the user consistently in a **caloric deficit, surplus, or stable**?
-
-### 3. Workout Analysis
-- Count **total workout days**.
-- Identify the **most frequently performed exercises**.
-- Calculate **total calories burned** from workouts.
-
-### 4. Consistency & Streaks
-- Determine the **longest streak without skipping** a day.
-- Count the **total number of skipped days**.
-- Identify the **week with the highest adherence** (most completed workouts & meals).
-- Identify the **week with the lowest adherence** (most skipped workouts & meals).
-
-### 5. Summary & Recommendations
+### 2. Summary & Recommendations
 - Provide a **brief summary** of the user's performance.
 - Offer **personalized tips** to improve results in the future.
 
-### 6. Fun Fact
+### 3. Fun Fact
 - Generate an **interesting insight** about the user's journey. Example:
   - "Your longest consistent streak was **12 days** without missing a single workout!"
   - "You burned the most calories on **Week 3**, reaching **4500 kcal** in one week!"
 
 
-### 7. State Changes & Wellbeing
-- Describe how the user's condition has changed (e.g., energy level, mood, sleep, motivation), if available in the daily plans.
+### 4. State Changes & Wellbeing
+- Describe how the user's condition has changed (e.g., energy level, mood, sleep, motivation), as far as the statistics above show.
 - Indicate how well the user **complied with the meal plan**:
   - Were there frequent deviations?
   - Did the user follow the diet daily?
@@ -76,21 +63,6 @@ Return only a structured JSON object. Do not include additional text, explanatio
 {{
   "goal_achieved": true/false,
   "progress_summary": "User lost X kg, achieved Y% of the goal.",
-  "nutrition_analysis": {{
-    "average_calories_per_day": X,
-    "calorie_trend": "deficit/surplus/stable"
-  }},
-  "workout_analysis": {{
-    "total_workout_days": X,
-    "most_frequent_exercises": ["Exercise 1", "Exercise 2"],
-    "total_calories_burned": Y
-  }},
-  "consistency": {{
-    "longest_streak_days": X,
-    "skipped_days": Y,
-    "best_week": "Week X",
-    "worst_week": "Week Y"
-  }},
   "summary": "Short paragraph summarizing performance and suggestions.",
   "fun_fact": "Interesting fact about the user's journey.",
 
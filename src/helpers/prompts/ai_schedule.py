@@ -1,6 +1,5 @@
 import json
-from datetime import datetime, timedelta
-from typing import List
+from typing import List, Optional
 
 from src.models.category import Category
 from src.models.user import PhysicalData, User
@@ -122,33 +121,15 @@ IMPORTANT VALIDATION RULES:
     return prompt
 
 
-async def fetch_weekly_schedule_prompt(
-    physical_data: PhysicalData,
-    category: str,
-    goal,
-    comments,
-    duration,
-    current_month,
-    current_week,
-):
-    now = datetime.now()
-    days_until_monday = (7 - now.weekday()) % 7
-    start_date = now + timedelta(days=days_until_monday)
-
-    weeks_offset = (current_month - 1) * 4 + (current_week - 1)
-    start_date += timedelta(weeks=weeks_offset)
+# Sent verbatim as the system message of every weekly request. Keep it free
+# of per-user or per-week values: providers cache identical prompt prefixes,
+# so with 12 weekly calls per session most input tokens become cache hits.
+# Dates, day numbers and weekdays are filled in by the server
+# (src/helpers/plan_calendar.py); the model only writes the content.
+WEEKLY_SCHEDULE_SYSTEM_PROMPT = """You are an AI-powered nutritionist and fitness coach. You generate a structured plan for ONE week of a multi-month program, for the user and the week named in the user message.
 
-    prompt = f"""
-You are an AI-powered nutritionist and fitness coach. Generate a structured plan ONLY for week {current_week} of month {current_month}.
-
-## User Details:
-- Goal: {goal}
-- Category: {category}
-- Restrictions/Comments: {comments}
-- Physical Data: {physical_data.weight}kg, {physical_data.height}cm, {physical_data.age} years old, {physical_data.gender} gender, {physical_data.activity_level} activity level, {physical_data.chronic_diseases} chronic_diseases 
 ## Schedule Requirements:
-- Generate a detailed 7-day plan (1 week).
-- The first day must be Monday ({start_date.strftime('%Y-%m-%d')}).
+- Generate a detailed 7-day plan (1 week), as exactly 7 day objects in order from Monday to Sunday.
 - Each day must include:
   - Meals: Breakfast, Lunch, Dinner. For each meal, list:
       - A list of food items with portion sizes.
@@ -156,54 +137,62 @@ You are an AI-powered nutritionist and fitness coach. Generate a structured plan
   - Workout details:
       - List of exercises with sets, reps, and calories burned per exercise.
   - Total daily calories consumed and burned.
-  - A default status field set to "not_done".
-  
+- Do NOT include dates, day numbers, weekday names, month/week numbers or status fields.
+- Later weeks of the program should progress gradually from earlier ones.
+
 - Return ONLY valid JSON. Do not include any markdown, code blocks, or extra text.
 - Your JSON MUST follow this schema exactly:
-{{
-  "month": {current_month},
-  "week": {current_week},
+{
   "days": [
-    {{
-      "date": "YYYY-MM-DD",
-      "day_number": 1,
-      "day_of_week": "Monday",
+    {
       "meals": [
-        {{
-          "meal": "breakfast",
-          "food": ["Example food item (portion)"],
-          "calories": 0
-        }},
-        {{
-          "meal": "lunch",
-          "food": ["Example food item (portion)"],
-          "calories": 0
-        }},
-        {{
-          "meal": "dinner",
-          "food": ["Example food item (portion)"],
-          "calories": 0
-        }}
+        {"meal": "breakfast", "food": ["Example food item (portion)"], "calories": 0},
+        {"meal": "lunch", "food": ["Example food item (portion)"], "calories": 0},
+        {"meal": "dinner", "food": ["Example food item (portion)"], "calories": 0}
       ],
       "total_calories": 0,
       "workout": [
-        {{
-          "exercise": "Exercise Name",
-          "sets": 0,
-          "reps": 0,
-          "calories_burned": 0
-        }}
+        {"exercise": "Exercise Name", "sets": 0, "reps": 0, "calories_burned": 0}
       ],
-      "total_calories_burned": 0,
-      "status": "not_done"
-    }},
+      "total_calories_burned": 0
+    },
     ... (6 more day objects)
   ]
-}}
-IMPORTANT VALIDATION RULES:
- All weeks must start with Monday
- Each month must have exactly 28 days (4 weeks)
- Meals and workouts must align with the user's goals and restrictions
-  Make sure that your response is a valid JSON object with no additional text.
+}
+Meals and workouts must align with the user's goals and restrictions.
+Make sure that your response is a valid JSON object with no additional text.
+"""
+
+
+# Economy mode asks for one base week per month plus swap alternatives. The
+# shared rules come first so both modes share the same cacheable prefix.
+ECONOMY_WEEK_SYSTEM_PROMPT = WEEKLY_SCHEDULE_SYSTEM_PROMPT + """
+## Economy Mode:
+This week is the BASE week of its month; the following weeks are derived from it.
+In the same JSON object, next to "days", also return:
+- "meal_alternatives": 2 extra options for each of breakfast, lunch and dinner, in the same format as the meals above (with the "meal" field set to the meal type) and with similar calories.
+- "exercise_alternatives": 4 exercises that can replace those of the week, in the same format as the workout items above.
+"""
+
+async def fetch_weekly_schedule_prompt(
+    physical_data: PhysicalData,
+    category: str,
+    goal,
+    comments,
+    duration,
+    current_month,
+    current_week,
+    progress_note: Optional[str] = None,
+):
+    """User message for one week; everything static lives in WEEKLY_SCHEDULE_SYSTEM_PROMPT."""
+    progress = f"\n## Progress So Far:\n{progress_note}\n" if progress_note else ""
+    prompt = f"""## User Details:
+- Goal: {goal}
+- Category: {category}
+- Restrictions/Comments: {comments}
+- Physical Data: {physical_data.weight}kg, {physical_data.height}cm, {physical_data.age} years old, {physical_data.gender} gender, {physical_data.activity_level} activity level, {physical_data.chronic_diseases} chronic_diseases
+- Program length: {min(int(duration), 3)} months
+{progress}
+Generate the plan ONLY for week {current_week} of month {current_month}.
 """
     return prompt
@@ -0,0 +1,159 @@
+import hashlib
+import json
+import re
+import time
+from collections import OrderedDict
+from logging import getLogger
+from typing import Optional
+
+import pymongo
+
+from src.core.settings import settings
+from src.models.cache import WeekScheduleCache
+from src.models.user import PhysicalData
+from src.schemas.ai.schedule import WeekContent
+
+logger = getLogger(__name__)
+
+WEIGHT_BUCKET_KG = 5
+HEIGHT_BUCKET_CM = 5
+AGE_BUCKET_YEARS = 5
+# The TTL index does most of the cleanup; the size cap is enforced at most
+# this often instead of costing a count on every write.
+EVICTION_INTERVAL_SECONDS = 300
+
+
+def _normalize_text(value) -> str:
+    if value is None:
+        return ""
+    value = re.sub(r"\s+", " ", str(value)).strip().lower()
+    return value.rstrip(".!?,; ")
+
+
+def _bucket(value, size: int) -> Optional[int]:
+    if value is None:
+        return None
+    return int(float(value) // size * size)
+
+
+def schedule_cache_key(
+    physical_data: PhysicalData,
+    category: str,
+    goal: str,
+    comments: str,
+    duration: int,
+    month: int,
+    week: int,
+    progress_note: Optional[str] = None,
+) -> str:
+    """Content hash of everything that shapes a weekly schedule prompt."""
+    payload = {
+        "category": _normalize_text(category),
+        "goal": _normalize_text(goal),
+        "comments": _normalize_text(comments),
+        "weight": _bucket(physical_data.weight, WEIGHT_BUCKET_KG),
+        "height": _bucket(physical_data.height, HEIGHT_BUCKET_CM),
+        "age": _bucket(physical_data.age, AGE_BUCKET_YEARS),
+        "gender": _normalize_text(physical_data.gender),
+        "activity_level": _normalize_text(physical_data.activity_level),
+        "chronic_diseases": _normalize_text(physical_data.chronic_diseases),
+        # Same cap as the prompt's "Program length".
+        "duration": min(int(duration), 3),
+        "month": int(month),
+        "week": int(week),
+    }
+    if progress_note:
+        payload["progress_note"] = _normalize_text(progress_note)
+    raw = json.dumps(payload, sort_keys=True, separators=(",", ":"))
+    return hashlib.sha256(raw.encode()).hexdigest()
+
+
+class ScheduleCache:
+    """Two-tier (in-process LRU + Mongo) cache of generated weeks.
+
+    Entries hold only the generated content; callers place it on their own
+    session's calendar.
+    """
+
+    def __init__(
+        self,
+        memory_items: int = settings.SCHEDULE_CACHE_MEMORY_ITEMS,
+        max_documents: int = settings.SCHEDULE_CACHE_MAX_DOCUMENTS,
+        ttl_seconds: int = settings.SCHEDULE_CACHE_TTL_SECONDS,
+        enabled: bool = settings.SCHEDULE_CACHE_ENABLED,
+    ):
+        self.memory_items = memory_items
+        self.max_documents = max_documents
+        self.ttl_seconds = ttl_seconds
+        self.enabled = enabled
+        self._memory: OrderedDict[str, tuple[float, WeekContent]] = OrderedDict()
+        self._last_eviction = 0.0
+
+    def _memory_get(self, key: str) -> Optional[WeekContent]:
+        entry = self._memory.get(key)
+        if entry is None:
+            return None
+        expires_at, week_data = entry
+        if expires_at < time.monotonic():
+            del self._memory[key]
+            return None
+        self._memory.move_to_end(key)
+        return week_data
+
+    def _memory_set(self, key: str, week_data: WeekContent) -> None:
+        self._memory[key] = (time.monotonic() + self.ttl_seconds, week_data)
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.memory_items:
+            self._memory.popitem(last=False)
+
+    async def get(self, key: str) -> Optional[WeekContent]:
+        if not self.enabled:
+            return None
+        week_data = self._memory_get(key)
+        if week_data is not None:
+            return week_data
+        try:
+            cached = await WeekScheduleCache.find_one({"key": key})
+            if cached is None:
+                return None
+            week_data = WeekContent.model_validate(cached.week_data)
+        except Exception as e:
+            logger.warning(f"Schedule cache lookup failed: {e}")
+            return None
+        self._memory_set(key, week_data)
+        return week_data
+
+    async def set(self, key: str, week_data: WeekContent) -> None:
+        if not self.enabled:
+            return
+        self._memory_set(key, week_data)
+        try:
+            await WeekScheduleCache.get_motor_collection().update_one(
+                {"key": key},
+                {"$set": {"week_data": week_data.model_dump(mode="json")},
+                 "$currentDate": {"created_at": True}},
+                upsert=True,
+            )
+            await self._evict_overflow()
+        except Exception as e:
+            logger.warning(f"Schedule cache write failed: {e}")
+
+    async def _evict_overflow(self) -> None:
+        now = time.monotonic()
+        if now - self._last_eviction < EVICTION_INTERVAL_SECONDS:
+            return
+        self._last_eviction = now
+        collection = WeekScheduleCache.get_motor_collection()
+        overflow = await collection.estimated_document_count() - self.max_documents
+        if overflow <= 0:
+            return
+        oldest = (
+            collection.find({}, {"_id": 1})
+            .sort("created_at", pymongo.ASCENDING)
+            .limit(overflow)
+        )
+        ids = [doc["_id"] async for doc in oldest]
+        await collection.delete_many({"_id": {"$in": ids}})
+
+
+schedule_cache = ScheduleCache()
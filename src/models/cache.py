@@ -0,0 +1,25 @@
+import datetime
+from typing import Any, Dict
+
+import pymongo
+from beanie import Document
+from pydantic import Field
+from pymongo import IndexModel
+
+from src.core.settings import settings
+
+
+class WeekScheduleCache(Document):
+    key: str
+    week_data: Dict[str, Any]
+    created_at: datetime.datetime = Field(default_factory=datetime.datetime.utcnow)
+
+    class Settings:
+        collection = "week_schedule_cache"
+        indexes = [
+            IndexModel([("key", pymongo.ASCENDING)], unique=True),
+            IndexModel(
+                [("created_at", pymongo.ASCENDING)],
+                expireAfterSeconds=settings.SCHEDULE_CACHE_TTL_SECONDS,
+            ),
+        ]
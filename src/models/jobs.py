@@ -0,0 +1,49 @@
+import datetime
+from enum import Enum
+from typing import Optional
+
+import pymongo
+from beanie import Document
+from pydantic import Field
+from pymongo import IndexModel
+
+
+class JobStatus(str, Enum):
+    QUEUED = "queued"
+    RUNNING = "running"
+    DONE = "done"
+    FAILED = "failed"
+
+
+class GenerationJob(Document):
+    session_id: str
+    user_id: str
+    status: JobStatus = JobStatus.QUEUED
+    attempts: int = 0
+    worker_id: Optional[str] = None
+    lease_expires_at: Optional[datetime.datetime] = None
+    heartbeat_at: Optional[datetime.datetime] = None
+    error_message: Optional[str] = None
+    # session_id while the job is QUEUED/RUNNING, None once DONE/FAILED; the
+    # unique index below allows one active job per session.
+    active_key: Optional[str] = None
+    created_at: datetime.datetime = Field(default_factory=datetime.datetime.utcnow)
+    updated_at: datetime.datetime = Field(default_factory=datetime.datetime.utcnow)
+
+    class Settings:
+        collection = "generation_jobs"
+        indexes = [
+            IndexModel(
+                [
+                    ("status", pymongo.ASCENDING),
+                    ("lease_expires_at", pymongo.ASCENDING),
+                    ("created_at", pymongo.ASCENDING),
+                ]
+            ),
+            IndexModel([("session_id", pymongo.ASCENDING)]),
+            IndexModel(
+                [("active_key", pymongo.ASCENDING)],
+                unique=True,
+                partialFilterExpression={"active_key": {"$type": "string"}},
+            ),
+        ]
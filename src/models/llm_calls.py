@@ -0,0 +1,34 @@
+import datetime
+from typing import Optional
+
+import pymongo
+from beanie import Document
+from pydantic import Field
+from pymongo import IndexModel
+
+
+class LLMCallRecord(Document):
+    operation: str
+    model: str
+    route: Optional[str] = None
+    session_id: Optional[str] = None
+    user_id: Optional[str] = None
+    attempt: int = 1
+    streamed: bool = False
+    status: str = "ok"
+    error: Optional[str] = None
+    prompt_tokens: int = 0
+    completion_tokens: int = 0
+    cached_tokens: int = 0
+    latency_ms: float = 0
+    time_to_first_token_ms: Optional[float] = None
+    cost_usd: float = 0
+    created_at: datetime.datetime = Field(default_factory=datetime.datetime.utcnow)
+
+    class Settings:
+        collection = "llm_calls"
+        indexes = [
+            IndexModel([("session_id", pymongo.ASCENDING)]),
+            IndexModel([("user_id", pymongo.ASCENDING), ("created_at", pymongo.DESCENDING)]),
+            IndexModel([("operation", pymongo.ASCENDING), ("created_at", pymongo.DESCENDING)]),
+        ]
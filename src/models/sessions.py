@@ -2,8 +2,11 @@ import datetime
 from enum import Enum
 from typing import Any, Dict, List, Optional
 
-from beanie import Document, before_event
+import pymongo
+from beanie import Document, PydanticObjectId, before_event
 from bson import ObjectId
+from pydantic import BaseModel, ConfigDict, Field, field_validator
+from pymongo import IndexModel
 
 
 class DayStatus(str, Enum):
@@ -20,20 +23,105 @@ class SessionStatus(str, Enum):
     FAILED = "failed"
 
 
+class GenerationMode(str, Enum):
+    STANDARD = "standard"
+    # One LLM week per month, the other weeks derived on the server.
+    ECONOMY = "economy"
+
+
+def _as_text(value) -> str:
+    return "" if value is None else str(value)
+
+
+class StoredMeal(BaseModel):
+    """A meal as stored on a DayPlan.
+
+    LLM output is validated strictly (src/schemas/ai/schedule.py) before it
+    is stored, but day plans written before that were stored as-is, so
+    reading them back must not fail on a missing key or an odd type.
+    """
+
+    model_config = ConfigDict(extra="allow")
+
+    meal: str = ""
+    food: List[str] = []
+    calories: Any = 0
+
+    @field_validator("meal", mode="before")
+    @classmethod
+    def coerce_meal(cls, value):
+        return _as_text(value)
+
+    @field_validator("food", mode="before")
+    @classmethod
+    def coerce_food(cls, value):
+        if value is None:
+            return []
+        if not isinstance(value, list):
+            value = [value]
+        return [str(item) for item in value]
+
+
+class StoredExercise(BaseModel):
+    model_config = ConfigDict(extra="allow")
+
+    exercise: str = ""
+    sets: Any = 0
+    reps: Any = 0
+    calories_burned: Any = 0
+
+    @field_validator("exercise", mode="before")
+    @classmethod
+    def coerce_exercise(cls, value):
+        return _as_text(value)
+
+
 class DayPlan(Document):
+    session_id: Optional[str] = None
+    user_id: Optional[str] = None
     month: Optional[str | int | None] = None
     week: Optional[str | int | None] = None
     day_number: int
     day_of_week: str
     date: datetime.datetime
-    meals: List[Dict]
-    workout: List[Dict]
+    meals: List[StoredMeal]
+    workout: List[StoredExercise]
     total_calories: int
     total_calories_burned: Optional[int] = 0
     status: DayStatus = DayStatus.NOT_DONE
 
     class Settings:
         collection = "day_plans"
+        indexes = [
+            # Every read of a session's days is one range scan in date order.
+            # _id breaks date ties for keyset pagination.
+            IndexModel(
+                [
+                    ("session_id", pymongo.ASCENDING),
+                    ("date", pymongo.ASCENDING),
+                    ("_id", pymongo.ASCENDING),
+                ]
+            ),
+            IndexModel([("user_id", pymongo.ASCENDING), ("date", pymongo.ASCENDING)]),
+        ]
+
+
+class DayPlanWeek(BaseModel):
+    id: PydanticObjectId = Field(alias="_id")
+    month: Optional[str | int | None] = None
+    week: Optional[str | int | None] = None
+
+
+class DayPlanProgress(BaseModel):
+    """The DayPlan fields progress analytics needs, without the meals."""
+
+    month: Optional[str | int | None] = None
+    week: Optional[str | int | None] = None
+    date: datetime.datetime
+    workout: List[StoredExercise]
+    total_calories: int
+    total_calories_burned: Optional[int] = 0
+    status: DayStatus = DayStatus.NOT_DONE
 
 
 class UserCategorySession(Document):
@@ -42,14 +130,74 @@ class UserCategorySession(Document):
     goal: str
     progress: float = 0.0
     comments: str
-    ai_generated_plan_table_ids: List[str] 
-    session_start: datetime.datetime = datetime.datetime.utcnow()
+    duration: int = 3
+    # Legacy: DayPlans now carry session_id. Kept for sessions created before
+    # that and no longer appended to (see migrations/backfill_dayplan_session_id.py).
+    ai_generated_plan_table_ids: List[str] = []
+    missing_weeks: List[Dict[str, int]] = []
+    # Number of plan weeks (in plan order) to generate so far; None means all.
+    target_weeks: Optional[int] = None
+    session_start: datetime.datetime = Field(default_factory=datetime.datetime.utcnow)
     session_end: Optional[datetime.datetime] = None
     status: SessionStatus = SessionStatus.PENDING
     error_message: Optional[str] = None
-    last_updated: datetime.datetime = datetime.datetime.utcnow()
+    last_updated: datetime.datetime = Field(default_factory=datetime.datetime.utcnow)
     result: Optional[Any] = None
     summary_table: Optional[Any] = None
+    # Generated offline through the batch pipeline instead of the worker.
+    batch: bool = False
+    mode: GenerationMode = GenerationMode.STANDARD
+    idempotency_key: Optional[str] = None
+    request_hash: Optional[str] = None
+    # request_hash while the session is PENDING/PROCESSING, None afterwards;
+    # the unique index below allows one in-flight generation per request.
+    inflight_key: Optional[str] = None
+    # Bumped by every state change (see src/repositories/sessions.py).
+    version: int = 0
 
     class Settings:
         collection = "user_category_sessions"
+        indexes = [
+            # get_sessions (newest first, keyset on _id) and the profile counters.
+            IndexModel(
+                [
+                    ("user_id", pymongo.ASCENDING),
+                    ("status", pymongo.ASCENDING),
+                    ("last_updated", pymongo.DESCENDING),
+                    ("_id", pymongo.DESCENDING),
+                ]
+            ),
+            # Most recently updated sessions of a user.
+            IndexModel([("user_id", pymongo.ASCENDING), ("last_updated", pymongo.DESCENDING)]),
+            # Batch export only ever looks at batch sessions.
+            IndexModel(
+                [("status", pymongo.ASCENDING)],
+                partialFilterExpression={"batch": True},
+            ),
+            IndexModel(
+                [("user_id", pymongo.ASCENDING), ("idempotency_key", pymongo.ASCENDING)],
+                unique=True,
+                partialFilterExpression={"idempotency_key": {"$type": "string"}},
+            ),
+            IndexModel(
+                [("user_id", pymongo.ASCENDING), ("inflight_key", pymongo.ASCENDING)],
+                unique=True,
+                partialFilterExpression={"inflight_key": {"$type": "string"}},
+            ),
+        ]
+
+
+class SessionSummary(BaseModel):
+    """What the session list shows; projected, so result/summary_table are never loaded."""
+
+    # Read from _id, serialized as "id" like a full document.
+    id: PydanticObjectId = Field(validation_alias="_id")
+    category_id: str
+    goal: str
+    status: SessionStatus
+    progress: float = 0.0
+    duration: int = 3
+    mode: GenerationMode = GenerationMode.STANDARD
+    session_start: datetime.datetime
+    session_end: Optional[datetime.datetime] = None
+    last_updated: datetime.datetime
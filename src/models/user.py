@@ -1,9 +1,11 @@
 import datetime
 from typing import Optional
 
+import pymongo
 from beanie import Document
 from bson import ObjectId
 from pydantic import BaseModel
+from pymongo import IndexModel
 
 
 class PhysicalData(Document):
@@ -31,3 +33,7 @@ class User(Document):
 
     class Settings:
         collection = "users"
+        indexes = [
+            # Existing databases: run migrations/dedupe_user_emails.py first.
+            IndexModel([("email", pymongo.ASCENDING)], unique=True),
+        ]
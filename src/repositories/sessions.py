@@ -0,0 +1,110 @@
+from datetime import datetime
+from logging import getLogger
+from typing import Any, Dict, Iterable, Optional
+
+from bson import ObjectId
+from pymongo import ReturnDocument
+
+from src.models.sessions import DayPlan, SessionStatus, UserCategorySession
+
+logger = getLogger(__name__)
+
+
+def _version_filter(version: int) -> Dict[str, Any]:
+    # Sessions stored before `version` existed have no such field.
+    return {"$in": [0, None]} if version == 0 else version
+
+
+def session_filter(
+    session_id: str,
+    expected_version: Optional[int] = None,
+    exclude_statuses: Iterable[SessionStatus] = (),
+    match: Optional[Dict[str, Any]] = None,
+) -> Dict[str, Any]:
+    query: Dict[str, Any] = {**(match or {}), "_id": ObjectId(session_id)}
+    if expected_version is not None:
+        query["version"] = _version_filter(expected_version)
+    exclude_statuses = list(exclude_statuses)
+    if exclude_statuses:
+        query["status"] = {"$nin": exclude_statuses}
+    return query
+
+
+def day_plan_filter(session_id: str, day_plan_id: str) -> Dict[str, Any]:
+    return {"_id": ObjectId(day_plan_id), "session_id": session_id}
+
+
+class SessionRepository:
+    """Single round trip, field-level writes for sessions and their days.
+
+    Every session write goes through update_session and bumps `version`;
+    callers that read a session, do slow work and then write back pass the
+    version they read as `expected_version` and get None when someone else
+    wrote first. Generation-side writes exclude COMPLETED, so they fail (and
+    the generation stops) once a session has been completed.
+    """
+
+    async def update_session(
+        self,
+        session_id: str,
+        set_fields: Dict[str, Any],
+        expected_version: Optional[int] = None,
+        exclude_statuses: Iterable[SessionStatus] = (),
+        match: Optional[Dict[str, Any]] = None,
+    ) -> Optional[UserCategorySession]:
+        """$set `set_fields` and bump the version; None if nothing matched.
+
+        `match` adds conditions of its own, e.g. a compare-and-set on a field.
+        """
+        query = session_filter(session_id, expected_version, exclude_statuses, match)
+        raw = await UserCategorySession.get_motor_collection().find_one_and_update(
+            query,
+            {
+                "$set": {**set_fields, "last_updated": datetime.utcnow()},
+                "$inc": {"version": 1},
+            },
+            return_document=ReturnDocument.AFTER,
+        )
+        return UserCategorySession.model_validate(raw) if raw else None
+
+    async def set_status(
+        self,
+        session_id: str,
+        status: SessionStatus,
+        error_message: Optional[str] = None,
+        exclude_statuses: Iterable[SessionStatus] = (),
+    ) -> Optional[UserCategorySession]:
+        now = datetime.utcnow()
+        fields: Dict[str, Any] = {"status": status}
+        if status == SessionStatus.ACTIVE:
+            fields["session_end"] = now
+        if error_message:
+            fields["error_message"] = error_message
+        if status not in (SessionStatus.PENDING, SessionStatus.PROCESSING):
+            fields["inflight_key"] = None
+        return await self.update_session(
+            session_id, fields, exclude_statuses=exclude_statuses
+        )
+
+    async def get_fields(self, session_id: str, *fields: str) -> Optional[Dict[str, Any]]:
+        """Just `fields` of a session as a raw dict, instead of the whole document."""
+        return await UserCategorySession.get_motor_collection().find_one(
+            {"_id": ObjectId(session_id)}, {field: 1 for field in fields}
+        )
+
+    async def update_day_plan(
+        self, session_id: str, day_plan_id: str, set_fields: Dict[str, Any]
+    ) -> Optional[DayPlan]:
+        """$set fields of one of the session's days; None if it is not one."""
+        query = day_plan_filter(session_id, day_plan_id)
+        collection = DayPlan.get_motor_collection()
+        if set_fields:
+            raw = await collection.find_one_and_update(
+                query, {"$set": set_fields}, return_document=ReturnDocument.AFTER
+            )
+        else:
+            raw = await collection.find_one(query)
+        return DayPlan.model_validate(raw) if raw else None
+
+
+session_repository = SessionRepository()
@@ -0,0 +1,69 @@
+import datetime
+from typing import List
+
+from pydantic import BaseModel, ConfigDict, Field, field_validator
+
+
+class Meal(BaseModel):
+    model_config = ConfigDict(extra="allow")
+
+    meal: str
+    food: List[str]
+    calories: int = 0
+
+    @field_validator("food", mode="before")
+    @classmethod
+    def wrap_single_food(cls, value):
+        return [value] if isinstance(value, str) else value
+
+
+class Exercise(BaseModel):
+    model_config = ConfigDict(extra="allow")
+
+    exercise: str
+    sets: int | str = 0
+    reps: int | str = 0
+    calories_burned: int = 0
+
+
+class DayContent(BaseModel):
+    """One day as the LLM generates it; calendar fields are added server-side."""
+
+    meals: List[Meal]
+    workout: List[Exercise] = []
+    total_calories: int
+    total_calories_burned: int = 0
+
+
+class WeekContent(BaseModel):
+    """The LLM's output for one week: exactly seven days, Monday first."""
+
+    days: List[DayContent] = Field(min_length=7, max_length=7)
+
+
+class EconomyWeekContent(WeekContent):
+    """A base week plus swap material for deriving the rest of the month."""
+
+    meal_alternatives: List[Meal] = []
+    exercise_alternatives: List[Exercise] = []
+
+
+class DaySchedule(DayContent):
+    date: datetime.date
+    day_number: int
+    day_of_week: str
+
+
+class WeekSchedule(BaseModel):
+    month: int
+    week: int
+    days: List[DaySchedule] = Field(min_length=1)
+
+
+class WeekFragment(BaseModel):
+    """Part of a week handed from the generator to the persistence layer."""
+
+    month: int
+    week: int
+    days: List[DaySchedule]
+    complete: bool = True
@@ -2,7 +2,8 @@ from typing import Dict, List, Optional
 
 from pydantic import BaseModel
 
-from src.models.sessions import DayStatus
+from src.models.sessions import (DayStatus, GenerationMode, StoredExercise,
+                                 StoredMeal)
 
 
 class SessionCreateReq(BaseModel):
@@ -10,11 +11,16 @@ class SessionCreateReq(BaseModel):
     goal: str
     duration: int
     comments: str
+    # Leave generation to the offline batch pipeline (see batch.py).
+    batch: bool = False
+    mode: GenerationMode = GenerationMode.STANDARD
 
 
 class DayPlanUpdate(BaseModel):
-    meals: Optional[List[Dict]] = None
-    workout: Optional[List[Dict]] = None
+    # Same lenient shapes as the stored DayPlan; strict validation is only
+    # for LLM output.
+    meals: Optional[List[StoredMeal]] = None
+    workout: Optional[List[StoredExercise]] = None
     total_calories: Optional[int] = None
     total_calories_burned: Optional[int] = None
     status: Optional[DayStatus] = None
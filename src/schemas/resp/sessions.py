@@ -0,0 +1,18 @@
+from typing import Any, List, Optional
+
+from pydantic import BaseModel
+
+from src.models.sessions import DayPlan
+
+
+class DayPlanPage(BaseModel):
+    items: List[DayPlan]
+    # Opaque tokens for the neighbouring pages; None at either end of the plan.
+    next_cursor: Optional[str] = None
+    prev_cursor: Optional[str] = None
+
+
+class SessionSummaryPage(BaseModel):
+    # SessionSummary, or the subset of it asked for with `fields`.
+    items: List[Any]
+    next_cursor: Optional[str] = None
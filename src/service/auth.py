@@ -1,5 +1,6 @@
 from bson import ObjectId
 from fastapi import HTTPException
+from pymongo.errors import DuplicateKeyError
 
 from src.helpers.jwt_handler import JWT
 from src.helpers.password import PasswordHandler
@@ -19,7 +20,12 @@ class AuthService:
             last_name=user.last_name,
             physical_data_id=str(physical_data_db.id),
         )
-        await user_db.insert()
+        try:
+            await user_db.insert()
+        except DuplicateKeyError:
+            await physical_data_db.delete()
+            raise HTTPException(
+                status_code=400, detail="User with this email already exists")
 
         user_id = str(user_db.id)
         return {
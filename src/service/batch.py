@@ -0,0 +1,198 @@
+import json
+from logging import getLogger
+from typing import IO, Dict, List, Optional, Set, Tuple
+
+from bson import ObjectId
+from openai.types.chat import ChatCompletion
+from pydantic import ValidationError
+
+from src.helpers.ai_schedule import plan_weeks, week_request_body
+from src.helpers.llm_metrics import bind_llm_attribution, llm_metrics
+from src.helpers.llm_policy import weekly_schedule_policy
+from src.helpers.plan_calendar import place_week, plan_start_date
+from src.helpers.prompts.ai_schedule import fetch_weekly_schedule_prompt
+from src.models.category import Category
+from src.models.sessions import SessionStatus, UserCategorySession
+from src.models.user import PhysicalData, User
+from src.schemas.ai.schedule import WeekContent, WeekFragment
+from src.service.sessions import UserCategorySessionService
+
+logger = getLogger(__name__)
+
+BATCH_ENDPOINT = "/v1/chat/completions"
+
+
+def batch_custom_id(session_id: str, month: int, week: int) -> str:
+    return f"{session_id}:{month}:{week}"
+
+
+def parse_custom_id(custom_id: str) -> Tuple[str, int, int]:
+    session_id, month, week = custom_id.split(":")
+    return session_id, int(month), int(week)
+
+
+class BatchLineError(Exception):
+    pass
+
+
+class BatchGenerationService:
+    """Offline weekly generation through an OpenAI-style batch JSONL file.
+
+    export() writes one request line per (session, month, week) that is not
+    stored yet; ingest() reads the provider's results file line by line and
+    stores every valid week. Both skip weeks that are already stored, so
+    either can be re-run after an interruption.
+    """
+
+    def __init__(self, session_service: UserCategorySessionService):
+        self.session_service = session_service
+
+    async def _pending_sessions(
+        self, session_ids: Optional[List[str]]
+    ) -> List[UserCategorySession]:
+        query = {
+            "batch": True,
+            "status": {"$in": [SessionStatus.PENDING, SessionStatus.PROCESSING]},
+        }
+        if session_ids:
+            query["_id"] = {"$in": [ObjectId(id) for id in session_ids]}
+        return await UserCategorySession.find(query).to_list()
+
+    async def export(
+        self, out: IO[str], session_ids: Optional[List[str]] = None
+    ) -> Dict[str, int]:
+        """Write batch request lines for every batch session still to generate."""
+        model = weekly_schedule_policy.tiers[0]
+        sessions = lines = 0
+        for session in await self._pending_sessions(session_ids):
+            session_id = str(session.id)
+            user = await User.find_one({"_id": ObjectId(session.user_id)})
+            category = await Category.find_one({"_id": ObjectId(session.category_id)})
+            if not user or not category:
+                logger.warning(f"Batch export: skipping session {session_id}, user or category not found.")
+                continue
+            physical_data = await PhysicalData.find_one(
+                {"_id": ObjectId(user.physical_data_id)}
+            )
+            stored_weeks = await self.session_service.get_stored_weeks(session)
+
+            for month, week in plan_weeks(session.duration):
+                if (month, week) in stored_weeks:
+                    continue
+                prompt = await fetch_weekly_schedule_prompt(
+                    physical_data, category.name, session.goal, session.comments,
+                    session.duration, month, week,
+                )
+                out.write(json.dumps({
+                    "custom_id": batch_custom_id(session_id, month, week),
+                    "method": "POST",
+                    "url": BATCH_ENDPOINT,
+                    "body": week_request_body(prompt, model),
+                }) + "\n")
+                lines += 1
+
+            if session.status == SessionStatus.PENDING:
+                await self.session_service.update_session_status(
+                    session_id, SessionStatus.PROCESSING
+                )
+            sessions += 1
+
+        logger.info(f"Batch export: {lines} requests for {sessions} sessions.")
+        return {"sessions": sessions, "requests": lines}
+
+    async def _ingest_line(
+        self,
+        line: str,
+        sessions: Dict[str, UserCategorySession],
+        stored: Dict[str, Set[Tuple[int, int]]],
+    ) -> bool:
+        """Store one result line; False if its week was already stored."""
+        try:
+            result = json.loads(line)
+            session_id, month, week = parse_custom_id(result["custom_id"])
+        except (ValueError, KeyError, TypeError) as e:
+            raise BatchLineError(f"Malformed result line: {e}")
+
+        if session_id not in sessions:
+            session = await UserCategorySession.find_one({"_id": ObjectId(session_id)})
+            if session is None:
+                raise BatchLineError("Session not found")
+            sessions[session_id] = session
+            stored[session_id] = await self.session_service.get_stored_weeks(session)
+        if (month, week) in stored[session_id]:
+            return False
+
+        if result.get("error"):
+            raise BatchLineError(f"Provider error: {result['error']}")
+        response = result.get("response") or {}
+        if response.get("status_code") != 200:
+            raise BatchLineError(f"Request failed with status {response.get('status_code')}")
+
+        completion = ChatCompletion.model_validate(response["body"])
+        bind_llm_attribution(session_id=session_id, user_id=sessions[session_id].user_id)
+        async with llm_metrics.track("weekly_schedule_batch", completion.model) as call:
+            call.set_usage(completion.usage)
+            try:
+                content = WeekContent.model_validate_json(
+                    completion.choices[0].message.content or ""
+                )
+            except ValidationError as e:
+                call.parse_failed(e)
+                raise BatchLineError(f"Invalid week payload: {e}")
+
+        week_data = place_week(
+            content, plan_start_date(sessions[session_id].session_start), month, week
+        )
+        fragment = WeekFragment(month=month, week=week, days=week_data.days)
+        await self.session_service.process_weekly_schedule(
+            fragment, session_id, sessions[session_id].user_id
+        )
+        await self.session_service.touch_session(session_id)
+        stored[session_id].add((month, week))
+        return True
+
+    async def ingest(self, results: IO[str], errors: Optional[IO[str]] = None) -> Dict:
+        """Stream a batch results file into DayPlans and finish its sessions.
+
+        Every failing line is reported (and written to `errors` as JSONL)
+        without stopping the import; the weeks it misses stay in the
+        session's missing_weeks.
+        """
+        sessions: Dict[str, UserCategorySession] = {}
+        stored: Dict[str, Set[Tuple[int, int]]] = {}
+        report = {"lines": 0, "stored": 0, "skipped": 0, "failed": 0}
+
+        for line_number, line in enumerate(results, start=1):
+            if not line.strip():
+                continue
+            report["lines"] += 1
+            try:
+                if await self._ingest_line(line, sessions, stored):
+                    report["stored"] += 1
+                else:
+                    report["skipped"] += 1
+            except Exception as e:
+                report["failed"] += 1
+                custom_id = None
+                try:
+                    custom_id = json.loads(line).get("custom_id")
+                except (ValueError, AttributeError):
+                    pass
+                logger.error(f"Batch ingest line {line_number} ({custom_id}): {e}")
+                if errors is not None:
+                    errors.write(json.dumps(
+                        {"line": line_number, "custom_id": custom_id, "error": str(e)}
+                    ) + "\n")
+
+        for session_id, session in sessions.items():
+            if session.status not in (SessionStatus.PENDING, SessionStatus.PROCESSING):
+                continue
+            try:
+                await self.session_service.finish_generation(session, stored[session_id])
+            except Exception as e:
+                await self.session_service.mark_generation_failed(
+                    session_id, f"Batch import failed: {e}"
+                )
+        report["sessions"] = len(sessions)
+        logger.info(f"Batch ingest: {report}")
+        return report
@@ -0,0 +1,186 @@
+import asyncio
+import os
+import socket
+from datetime import datetime, timedelta
+from logging import getLogger
+from typing import Optional
+
+from pymongo import ReturnDocument
+from pymongo.errors import DuplicateKeyError
+
+from src.core.settings import settings
+from src.helpers.llm_metrics import bind_llm_attribution
+from src.models.jobs import GenerationJob, JobStatus
+
+logger = getLogger(__name__)
+
+
+class GenerationJobQueue:
+    """Mongo-backed queue of schedule generation jobs with leases."""
+
+    async def enqueue(self, session_id: str, user_id: str) -> GenerationJob:
+        """Queue generation for a session, reusing a job that is still active."""
+        existing = await GenerationJob.find_one(
+            {
+                "session_id": session_id,
+                "status": {"$in": [JobStatus.QUEUED, JobStatus.RUNNING]},
+            }
+        )
+        if existing:
+            return existing
+        job = GenerationJob(session_id=session_id, user_id=user_id, active_key=session_id)
+        try:
+            await job.insert()
+        except DuplicateKeyError:
+            # Another API process queued it between our lookup and insert.
+            existing = await GenerationJob.find_one({"active_key": session_id})
+            if existing:
+                return existing
+            raise
+        return job
+
+    async def lease(self, worker_id: str) -> Optional[GenerationJob]:
+        """Atomically claim the oldest queued job or one whose lease expired."""
+        now = datetime.utcnow()
+        raw = await GenerationJob.get_motor_collection().find_one_and_update(
+            {
+                "$or": [
+                    {"status": JobStatus.QUEUED},
+                    {"status": JobStatus.RUNNING, "lease_expires_at": {"$lt": now}},
+                ]
+            },
+            {
+                "$set": {
+                    "status": JobStatus.RUNNING,
+                    "worker_id": worker_id,
+                    "lease_expires_at": now + timedelta(seconds=settings.JOB_LEASE_SECONDS),
+                    "heartbeat_at": now,
+                    "updated_at": now,
+                },
+                "$inc": {"attempts": 1},
+            },
+            sort=[("created_at", 1)],
+            return_document=ReturnDocument.AFTER,
+        )
+        return GenerationJob.model_validate(raw) if raw else None
+
+    async def heartbeat(self, job: GenerationJob, worker_id: str) -> bool:
+        """Extend the lease; False means another worker has taken the job."""
+        now = datetime.utcnow()
+        result = await GenerationJob.get_motor_collection().update_one(
+            {"_id": job.id, "worker_id": worker_id, "status": JobStatus.RUNNING},
+            {
+                "$set": {
+                    "lease_expires_at": now + timedelta(seconds=settings.JOB_LEASE_SECONDS),
+                    "heartbeat_at": now,
+                    "updated_at": now,
+                }
+            },
+        )
+        return result.matched_count == 1
+
+    async def complete(self, job: GenerationJob) -> None:
+        await self._finish(job, {"status": JobStatus.DONE, "error_message": None})
+
+    async def release(self, job: GenerationJob) -> None:
+        """Hand a job back to the queue, e.g. on worker shutdown."""
+        await self._finish(
+            job, {"status": JobStatus.QUEUED}, inc={"attempts": -1}
+        )
+
+    async def fail(self, job: GenerationJob, error: str) -> None:
+        status = (
+            JobStatus.QUEUED
+            if job.attempts < settings.JOB_MAX_ATTEMPTS
+            else JobStatus.FAILED
+        )
+        await self._finish(job, {"status": status, "error_message": error})
+
+    async def _finish(self, job: GenerationJob, fields: dict, inc: Optional[dict] = None) -> None:
+        if fields["status"] in (JobStatus.DONE, JobStatus.FAILED):
+            fields = {**fields, "active_key": None}
+        update = {
+            "$set": {
+                **fields,
+                "worker_id": None,
+                "lease_expires_at": None,
+                "updated_at": datetime.utcnow(),
+            }
+        }
+        if inc:
+            update["$inc"] = inc
+        await GenerationJob.get_motor_collection().update_one(
+            {"_id": job.id, "worker_id": job.worker_id}, update
+        )
+
+
+class GenerationWorker:
+    """Leases generation jobs and runs them, keeping their leases alive."""
+
+    def __init__(
+        self,
+        session_service,
+        queue: Optional[GenerationJobQueue] = None,
+        worker_id: Optional[str] = None,
+        concurrency: int = settings.WORKER_CONCURRENCY,
+    ):
+        self.session_service = session_service
+        self.queue = queue or GenerationJobQueue()
+        self.worker_id = worker_id or f"{socket.gethostname()}:{os.getpid()}"
+        self.concurrency = concurrency
+
+    async def run(self, stop: asyncio.Event) -> None:
+        running = set()
+        logger.info(f"Generation worker {self.worker_id} started.")
+        while not stop.is_set():
+            if len(running) < self.concurrency:
+                job = await self.queue.lease(self.worker_id)
+                if job:
+                    task = asyncio.create_task(self._run_job(job))
+                    running.add(task)
+                    task.add_done_callback(running.discard)
+                    continue
+            try:
+                await asyncio.wait_for(stop.wait(), settings.JOB_POLL_SECONDS)
+            except asyncio.TimeoutError:
+                pass
+
+        # Unfinished jobs go back to the queue; whoever picks them up next
+        # resumes after the weeks that are already stored.
+        for task in running:
+            task.cancel()
+        await asyncio.gather(*running, return_exceptions=True)
+        logger.info(f"Generation worker {self.worker_id} stopped.")
+
+    async def _run_job(self, job: GenerationJob) -> None:
+        if job.attempts > settings.JOB_MAX_ATTEMPTS:
+            await self.queue.fail(job, "Too many attempts")
+            await self.session_service.mark_generation_failed(
+                job.session_id, "Schedule generation failed: too many attempts"
+            )
+            return
+
+        logger.info(f"Job {job.id}: generating session {job.session_id} (attempt {job.attempts}).")
+        bind_llm_attribution(route="worker:generation")
+        work = asyncio.create_task(
+            self.session_service.generate_full_schedule(job.session_id)
+        )
+        try:
+            while not work.done():
+                await asyncio.wait({work}, timeout=settings.JOB_HEARTBEAT_SECONDS)
+                if not work.done() and not await self.queue.heartbeat(job, self.worker_id):
+                    logger.warning(f"Job {job.id}: lease lost, abandoning.")
+                    work.cancel()
+                    await asyncio.gather(work, return_exceptions=True)
+                    return
+            work.result()
+        except asyncio.CancelledError:
+            work.cancel()
+            await asyncio.gather(work, return_exceptions=True)
+            await self.queue.release(job)
+            raise
+        except Exception as e:
+            logger.error(f"Job {job.id} failed: {e}")
+            await self.queue.fail(job, str(e))
+            return
+        await self.queue.complete(job)
@@ -1,7 +1,12 @@
+import asyncio
+from typing import Dict
+
 from beanie import Link, PydanticObjectId
 from bson import ObjectId
 from fastapi import HTTPException
 from fastapi.encoders import jsonable_encoder
+from pymongo import ReturnDocument
+from pymongo.errors import DuplicateKeyError
 
 from src.models.sessions import SessionStatus, UserCategorySession
 from src.helpers.jwt_handler import JWT
@@ -13,17 +18,30 @@ from src.schemas.req.user import UserCreateReq, UserLoginReq
 
 class ProfileService:
 
+    async def _session_counts(self, user_id: str) -> Dict[str, int]:
+        """Sessions per status in one round trip, covered by the (user_id, status) index."""
+        pipeline = [
+            {"$match": {"user_id": user_id}},
+            {"$group": {"_id": "$status", "count": {"$sum": 1}}},
+        ]
+        rows = await UserCategorySession.aggregate(pipeline).to_list()
+        return {row["_id"]: row["count"] for row in rows}
+
     async def get_user_by_id(self, user_id: str):
-        user = await User.find_one(User.id == PydanticObjectId(user_id))
+        # The counts only need user_id, so they run alongside the user lookup.
+        user, counts = await asyncio.gather(
+            User.find_one(User.id == PydanticObjectId(user_id)),
+            self._session_counts(user_id),
+        )
         if not user:
             raise HTTPException(status_code=404, detail="User not found")
         ph_data = await PhysicalData.find_one(
             PhysicalData.id == PydanticObjectId(user.physical_data_id)
         )
 
-        total_sessions = await UserCategorySession.find({"user_id": user_id}).count()
-        active_sessions = await UserCategorySession.find({"user_id": user_id, "status": SessionStatus.ACTIVE}).count()
-        completed_sessions = await UserCategorySession.find({"user_id": user_id, "status": SessionStatus.COMPLETED}).count()
+        total_sessions = sum(counts.values())
+        active_sessions = counts.get(SessionStatus.ACTIVE.value, 0)
+        completed_sessions = counts.get(SessionStatus.COMPLETED.value, 0)
 
         return {
             "id": str(user.id),
@@ -47,47 +65,57 @@ class ProfileService:
         }
 
     async def update_profile(self, user_id: str, profile_data: UserProfileUpdateReq):
-        user = await User.find_one(User.id == PydanticObjectId(user_id))
-        if not user:
-            raise HTTPException(status_code=404, detail="User not found")
-
-        if profile_data.first_name is not None:
-            user.first_name = profile_data.first_name
-        if profile_data.last_name is not None:
-            user.last_name = profile_data.last_name
-        if profile_data.email is not None:
-            user.email = profile_data.email
+        # Field-level $set instead of find/save, so two edits of different
+        # fields cannot undo each other.
+        user_fields = {
+            field: getattr(profile_data, field)
+            for field in ("first_name", "last_name", "email")
+            if getattr(profile_data, field) is not None
+        }
         if profile_data.password is not None:
-            user.password = PasswordHandler.hash(profile_data.password)
+            user_fields["password"] = PasswordHandler.hash(profile_data.password)
+
+        users = User.get_motor_collection()
+        try:
+            if user_fields:
+                raw_user = await users.find_one_and_update(
+                    {"_id": ObjectId(user_id)},
+                    {"$set": user_fields},
+                    return_document=ReturnDocument.AFTER,
+                )
+            else:
+                raw_user = await users.find_one({"_id": ObjectId(user_id)})
+        except DuplicateKeyError:
+            raise HTTPException(
+                status_code=400, detail="User with this email already exists")
+        if not raw_user:
+            raise HTTPException(status_code=404, detail="User not found")
+        user = User.model_validate(raw_user)
 
         if profile_data.physical_data:
+            physical_fields = {
+                field: getattr(profile_data.physical_data, field)
+                for field in ("weight", "height", "age", "gender", "chronic_diseases", "activity_level")
+                if getattr(profile_data.physical_data, field) is not None
+            }
             if user.physical_data_id:
-                physical_data = await PhysicalData.find_one(
-                    PhysicalData.id == PydanticObjectId(user.physical_data_id)
-                )
-                if not physical_data:
+                physical = PhysicalData.get_motor_collection()
+                query = {"_id": ObjectId(user.physical_data_id)}
+                if physical_fields:
+                    result = await physical.update_one(query, {"$set": physical_fields})
+                    found = result.matched_count == 1
+                else:
+                    found = await physical.count_documents(query, limit=1) == 1
+                if not found:
                     raise HTTPException(
                         status_code=404, detail="Physical data not found"
                     )
             else:
-                physical_data = PhysicalData()
-
-            if profile_data.physical_data.weight is not None:
-                physical_data.weight = profile_data.physical_data.weight
-            if profile_data.physical_data.height is not None:
-                physical_data.height = profile_data.physical_data.height
-            if profile_data.physical_data.age is not None:
-                physical_data.age = profile_data.physical_data.age
-            if profile_data.physical_data.gender is not None:
-                physical_data.gender = profile_data.physical_data.gender
-            if profile_data.physical_data.chronic_diseases is not None:
-                physical_data.chronic_diseases = profile_data.physical_data.chronic_diseases
-            if profile_data.physical_data.activity_level is not None:
-                physical_data.activity_level = profile_data.physical_data.activity_level
-                
-
-            await physical_data.save()
-            user.physical_data_id = str(physical_data.id)
+                physical_data = PhysicalData(**physical_fields)
+                await physical_data.insert()
+                user.physical_data_id = str(physical_data.id)
+                await users.update_one(
+                    {"_id": user.id}, {"$set": {"physical_data_id": user.physical_data_id}}
+                )
 
-        await user.save()
         return user
@@ -1,83 +1,153 @@
-from datetime import datetime
+import asyncio
+import hashlib
+import json
+from contextlib import aclosing
+from datetime import datetime, time
+from functools import lru_cache
 from io import BytesIO
 from logging import getLogger
-from typing import Any, Dict, List, Optional
+from typing import Any, Dict, List, Optional, Set, Tuple, Type
 
 from bson import ObjectId
-from fastapi import BackgroundTasks, HTTPException, Response
+from fastapi import Depends, HTTPException, Response
+from pymongo.errors import DuplicateKeyError
+from openai import AsyncOpenAI
+from pydantic import BaseModel, create_model
 from reportlab.lib import colors
 from reportlab.lib.pagesizes import landscape, letter
 from reportlab.lib.styles import ParagraphStyle, getSampleStyleSheet
 from reportlab.platypus import (Paragraph, SimpleDocTemplate, Spacer, Table,
                                 TableStyle,)
 from reportlab.lib.enums import TA_CENTER
-from src.helpers.ai_schedule import AIScheduleGenerator
+from src.core.container import get_llm_client
+from src.core.settings import settings
+from src.helpers.ai_schedule import AIScheduleGenerator, plan_weeks
+from src.helpers.llm_metrics import bind_llm_attribution, llm_metrics
+from src.helpers.pagination import (NEXT, PREV, decode_cursor, encode_cursor,
+                                    keyset_filter, keyset_sort)
+from src.helpers.plan_calendar import DAYS_PER_WEEK, plan_start_date
+from src.helpers.progress_analytics import adherence_note
 from src.models.category import Category
-from src.models.sessions import (DayPlan, DayStatus, SessionStatus,
+from src.models.sessions import (DayPlan, DayPlanProgress, DayPlanWeek,
+                                 DayStatus, SessionStatus, SessionSummary,
                                  UserCategorySession)
 from src.models.user import PhysicalData, User
+from src.repositories.sessions import session_repository
+from src.schemas.ai.schedule import WeekFragment
 from src.schemas.req.sessions import DayPlanUpdate, SessionCreateReq
+from src.schemas.resp.sessions import DayPlanPage, SessionSummaryPage
+from src.service.jobs import GenerationJobQueue
 
 logger = getLogger(__name__)
 
+# Per-process singleflight for identical create requests: key -> (lock, number
+# of requests holding or waiting on it). The entry is dropped only when that
+# count reaches zero; lock.locked() is already False while waiters are queued.
+_create_locks: Dict[str, Tuple[asyncio.Lock, int]] = {}
+
+
+def week_filter(month: int, week: int) -> Dict[str, Any]:
+    # Older plans stored month/week as strings.
+    return {"month": {"$in": [month, str(month)]}, "week": {"$in": [week, str(week)]}}
+
+
+def session_request_hash(user_id: str, req: SessionCreateReq) -> str:
+    raw = json.dumps(
+        [
+            user_id,
+            req.category_id,
+            " ".join(req.goal.split()).lower(),
+            " ".join(req.comments.split()).lower(),
+            req.duration,
+            req.batch,
+            req.mode,
+        ]
+    )
+    return hashlib.sha256(raw.encode()).hexdigest()
+
+
+@lru_cache(maxsize=64)
+def _summary_model(fields: Tuple[str, ...]) -> Type[BaseModel]:
+    """SessionSummary cut down to `fields`.
+
+    id and last_updated are always kept: the list cursor is built from them.
+    """
+    if not fields:
+        return SessionSummary
+    unknown = [name for name in fields if name not in SessionSummary.model_fields]
+    if unknown:
+        raise HTTPException(status_code=400, detail=f"Unknown fields: {', '.join(unknown)}")
+    keep = {"id", "last_updated", *fields}
+    return create_model(
+        "SessionSummaryFields",
+        **{
+            name: (info.annotation, info)
+            for name, info in SessionSummary.model_fields.items()
+            if name in keep
+        },
+    )
+
 
 class UserCategorySessionService:
-    def __init__(self):
-        self.schedule_generator = AIScheduleGenerator()
+    def __init__(self, llm_client: AsyncOpenAI = Depends(get_llm_client)):
+        self.schedule_generator = AIScheduleGenerator(llm_client)
+        self.job_queue = GenerationJobQueue()
 
-    async def _update_session_status(
+    async def update_session_status(
         self,
         session_id: str,
         status: SessionStatus,
         error_message: Optional[str] = None,
     ) -> None:
-        """Update session status and timestamps."""
-        try:
-            session = await UserCategorySession.find_one({"_id": ObjectId(session_id)})
-            if session:
-                session.status = status
-                session.last_updated = datetime.utcnow()
+        """Update session status and timestamps in one atomic write.
 
-                if status == SessionStatus.ACTIVE:
-                    session.session_end = datetime.utcnow()
-
-                if error_message:
-                    session.error_message = error_message
-
-                await session.save()
-                logger.info(
-                    f"Session {session_id} status updated to: {status}")
+        A COMPLETED session is final, so a generation job finishing late
+        cannot turn it back into ACTIVE or FAILED.
+        """
+        try:
+            exclude = () if status == SessionStatus.COMPLETED else (SessionStatus.COMPLETED,)
+            session = await session_repository.set_status(
+                session_id, status, error_message, exclude
+            )
+            if session is None:
+                logger.warning(
+                    f"Session {session_id}: not set to {status}, session missing or completed.")
+                return
+            logger.info(
+                f"Session {session_id} status updated to: {status}")
         except Exception as e:
             logger.error(f"Failed to update session status: {e}")
             raise
 
     async def process_weekly_schedule(
-        self, week_data: Dict[str, Any], session_id: str
+        self, week_data: WeekFragment, session_id: str, user_id: Optional[str] = None
     ) -> List[DayPlan]:
-        """Process weekly schedule data into DayPlan objects."""
-        day_plans = []
-
+        """Turn validated schedule days into stored DayPlan objects."""
         try:
-            print("Processing week data...")
-            week = week_data["week"]
-            month = week_data["month"]
-            for day in week_data["days"]:
-                day_plan = DayPlan(
-                    month=month,
-                    week=week,
-                    day_number=day["day_number"],
-                    day_of_week=day["day_of_week"],
-                    date=datetime.strptime(day["date"], "%Y-%m-%d"),
-                    meals=day["meals"],
-                    workout=day["workout"],
-                    total_calories=day["total_calories"],
-                    total_calories_burned=day.get("total_calories_burned", 0),
+            day_plans = [
+                DayPlan(
+                    session_id=session_id,
+                    user_id=user_id,
+                    month=week_data.month,
+                    week=week_data.week,
+                    day_number=day.day_number,
+                    day_of_week=day.day_of_week,
+                    date=datetime.combine(day.date, time()),
+                    meals=[meal.model_dump() for meal in day.meals],
+                    workout=[exercise.model_dump() for exercise in day.workout],
+                    total_calories=day.total_calories,
+                    total_calories_burned=day.total_calories_burned,
                     status=DayStatus.NOT_DONE,
                 )
-                print("Inserting day plan...")
-                await day_plan.insert()
-                day_plans.append(day_plan)
-                print("Day plan inserted.")
+                for day in week_data.days
+            ]
+            if not day_plans:
+                return day_plans
+
+            # One insert_many per week instead of a round trip per day.
+            result = await DayPlan.insert_many(day_plans)
+            for day_plan, inserted_id in zip(day_plans, result.inserted_ids):
+                day_plan.id = inserted_id
 
             return day_plans
 
@@ -88,140 +158,479 @@ class UserCategorySessionService:
                 status_code=500, detail=f"Error processing schedule data: {str(e)}"
             )
 
-    async def generate_full_schedule(
-        self,
-        user: User,
-        category: Category,
-        goal: str,
-        comments: str,
-        duration: int,
-        session_id: str,
-    ) -> None:
-        """Generate and save the complete training schedule."""
+    async def touch_session(self, session_id: str) -> bool:
+        """Bump last_updated and version after new day plans were stored.
+
+        DayPlans point at their session, so the session document itself no
+        longer grows with every generated day. False once the session is
+        COMPLETED: generation for it must stop.
+        """
+        session = await session_repository.update_session(
+            session_id, {}, exclude_statuses=(SessionStatus.COMPLETED,)
+        )
+        return session is not None
+
+    def _day_plans(self, session_id: str):
+        """All days of a session, in date order, via the (session_id, date) index."""
+        return DayPlan.find({"session_id": session_id}).sort("date")
+
+    async def get_stored_weeks(self, session: UserCategorySession) -> Set[Tuple[int, int]]:
+        """Complete (month, week) pairs already stored for this session.
+
+        Days left behind by a week whose stream broke off are removed, so the
+        week is generated again from scratch.
+        """
+        stored = await DayPlan.find(
+            {"session_id": str(session.id)}
+        ).project(DayPlanWeek).to_list()
+
+        days_by_week: Dict[Tuple[int, int], List[ObjectId]] = {}
+        for day in stored:
+            days_by_week.setdefault((int(day.month), int(day.week)), []).append(day.id)
+
+        partial_ids = [
+            day_id
+            for days in days_by_week.values()
+            if len(days) < DAYS_PER_WEEK
+            for day_id in days
+        ]
+        if partial_ids:
+            await DayPlan.find({"_id": {"$in": partial_ids}}).delete()
+        return {
+            week for week, days in days_by_week.items() if len(days) >= DAYS_PER_WEEK
+        }
+
+    async def generate_full_schedule(self, session_id: str) -> None:
+        """Generate and save the training schedule, resuming after stored weeks.
+
+        With lazy generation only the first `target_weeks` weeks are built;
+        extending an ACTIVE session keeps it ACTIVE and personalizes the new
+        weeks with the adherence observed so far.
+        """
+        extending = False
         try:
-            await self._update_session_status(session_id, SessionStatus.PROCESSING)
-            physical_data = await PhysicalData.find_one(
-                {"_id": ObjectId(user.physical_data_id)}
-            )
-            print("Generating full schedule...")
-            schedules = await self.schedule_generator.generate_full_schedule(
-                physical_data=physical_data,
-                category=category.name,
-                goal=goal,
-                comments=comments,
-                duration=duration,
-            )
-            print("Schedule generated.")
-            print(schedules)
             session = await UserCategorySession.find_one({"_id": ObjectId(session_id)})
             if not session:
                 raise HTTPException(
                     status_code=404, detail="Session not found")
-
-            for week_schedule in schedules:
-                day_plans = await self.process_weekly_schedule(
-                    week_schedule, session_id
-                )
-                for day_plan in day_plans:
-                    if str(day_plan.id) not in session.ai_generated_plan_table_ids:
-                        session.ai_generated_plan_table_ids.append(
-                            str(day_plan.id))
-                session.last_updated = datetime.utcnow()
-                await session.save()
-
-            await self._update_session_status(session_id, SessionStatus.ACTIVE)
+            user = await User.find_one({"_id": ObjectId(session.user_id)})
+            category = await Category.find_one({"_id": ObjectId(session.category_id)})
+            if not user or not category:
+                raise HTTPException(
+                    status_code=404, detail="User or category not found")
+            physical_data = await PhysicalData.find_one(
+                {"_id": ObjectId(user.physical_data_id)}
+            )
+            bind_llm_attribution(session_id=session_id, user_id=session.user_id)
+            if session.status == SessionStatus.COMPLETED:
+                logger.info(f"Session {session_id} is completed, nothing to generate.")
+                return
+
+            extending = session.status == SessionStatus.ACTIVE
+            if not extending:
+                await self.update_session_status(session_id, SessionStatus.PROCESSING)
+            stored_weeks = await self.get_stored_weeks(session)
+            if stored_weeks:
+                logger.info(
+                    f"Session {session_id}: resuming, {len(stored_weeks)} weeks already stored.")
+            progress_note = await self._progress_note(session, physical_data) if extending else None
+
+            target_weeks = session.target_weeks
+            while True:
+                # Persist every fragment (a whole week, or a single day when the
+                # LLM is streamed) as soon as it arrives, so GET /session/{id}
+                # can serve it while the rest is still PROCESSING.
+                completed = False
+                async with aclosing(self.schedule_generator.iter_full_schedule(
+                    physical_data=physical_data,
+                    category=category.name,
+                    goal=session.goal,
+                    comments=session.comments,
+                    duration=session.duration,
+                    skip_weeks=stored_weeks,
+                    plan_start=plan_start_date(session.session_start),
+                    weeks=plan_weeks(session.duration)[:target_weeks],
+                    progress_note=progress_note,
+                    mode=session.mode,
+                )) as fragments:
+                    async for fragment in fragments:
+                        await self.process_weekly_schedule(
+                            fragment, session_id, session.user_id
+                        )
+                        if not await self.touch_session(session_id):
+                            completed = True
+                            break
+                        if fragment.complete:
+                            stored_weeks.add((fragment.month, fragment.week))
+                if completed:
+                    # Closing the generator cancels the weeks still in flight.
+                    logger.info(f"Session {session_id} was completed, stopping generation.")
+                    return
+
+                # The target may have been raised while we were generating;
+                # the job dedup means nobody else will pick that up.
+                latest = await session_repository.get_fields(session_id, "target_weeks", "status")
+                if latest is None or latest.get("status") == SessionStatus.COMPLETED:
+                    return
+                if latest.get("target_weeks") == target_weeks:
+                    break
+                target_weeks = session.target_weeks = latest.get("target_weeks")
+
+            await self.finish_generation(session, stored_weeks, activate=not extending)
 
         except Exception as e:
             error_msg = f"Schedule generation failed: {str(e)}"
             logger.error(f"Session {session_id}: {error_msg}")
-            await self._update_session_status(
-                session_id, SessionStatus.FAILED, error_message=error_msg
-            )
+            if not extending:
+                await self.update_session_status(
+                    session_id, SessionStatus.FAILED, error_message=error_msg
+                )
             raise
 
-    async def create_session(
-        self, bg_tasks: BackgroundTasks, user_id: str, req: SessionCreateReq
-    ) -> Dict[str, str]:
-        """Create a new training session and start schedule generation."""
-        logger.info("🛠 Creating new training session...")
+    async def _progress_note(
+        self, session: UserCategorySession, physical_data: PhysicalData
+    ) -> Optional[str]:
+        day_plans = await self._day_plans(str(session.id)).project(DayPlanProgress).to_list()
+        return adherence_note(day_plans, physical_data, datetime.utcnow().date())
 
-        try:
-            user = await User.find_one({"_id": ObjectId(user_id)})
-            if not user:
-                raise HTTPException(status_code=404, detail="User not found")
+    async def finish_generation(
+        self,
+        session: UserCategorySession,
+        stored_weeks: Set[Tuple[int, int]],
+        activate: bool = True,
+    ) -> None:
+        """Record which weeks are missing and activate the session."""
+        session_id = str(session.id)
+        missing_weeks = [
+            {"month": month, "week": week}
+            for month, week in plan_weeks(session.duration)[:session.target_weeks]
+            if (month, week) not in stored_weeks
+        ]
+        updated = await session_repository.update_session(
+            session_id,
+            {"missing_weeks": missing_weeks},
+            exclude_statuses=(SessionStatus.COMPLETED,),
+        )
+        if updated is None:
+            logger.info(f"Session {session_id} was completed, not activating it.")
+            return
+        if not stored_weeks:
+            raise Exception("No weeks could be generated")
+        if missing_weeks:
+            logger.warning(
+                f"Session {session_id}: {len(missing_weeks)} weeks missing after retries.")
+
+        if activate:
+            await self.update_session_status(session_id, SessionStatus.ACTIVE)
+
+    async def schedule_ahead(self, session: UserCategorySession, day_number: int) -> None:
+        """Queue the next weeks of a lazily generated plan once the user is
+        within LAZY_LOOKAHEAD_DAYS of the last generated day."""
+        total_weeks = len(plan_weeks(session.duration))
+        if session.target_weeks is None or session.target_weeks >= total_weeks:
+            return
+        if session.status != SessionStatus.ACTIVE:
+            return
+        if day_number + settings.LAZY_LOOKAHEAD_DAYS <= session.target_weeks * DAYS_PER_WEEK:
+            return
+
+        target_weeks = min(total_weeks, session.target_weeks + settings.LAZY_EXTEND_WEEKS)
+        # Compare-and-set, so concurrent reads extend the plan only once, and
+        # never after the session was completed.
+        extended = await session_repository.update_session(
+            str(session.id),
+            {"target_weeks": target_weeks},
+            exclude_statuses=(SessionStatus.COMPLETED,),
+            match={"target_weeks": session.target_weeks},
+        )
+        if extended is not None:
+            logger.info(
+                f"Session {session.id}: extending plan to {target_weeks} weeks (user at day {day_number}).")
+            session.target_weeks = target_weeks
+            await self.job_queue.enqueue(str(session.id), session.user_id)
+
+    async def mark_generation_failed(self, session_id: str, error_message: str) -> None:
+        # A failed lazy extension leaves the weeks the user already has usable.
+        extension = await session_repository.update_session(
+            session_id,
+            {"error_message": error_message},
+            match={"status": SessionStatus.ACTIVE},
+        )
+        if extension is not None:
+            return
+        await self.update_session_status(
+            session_id, SessionStatus.FAILED, error_message=error_message
+        )
 
-            category = await Category.find_one({"_id": ObjectId(req.category_id)})
-            if not category:
-                raise HTTPException(
-                    status_code=404, detail="Category not found")
-            session = UserCategorySession(
-                user_id=user_id,
-                category_id=req.category_id,
-                goal=req.goal,
-                comments=req.comments,
-                ai_generated_plan_table_ids=[],
-            )
-            await session.insert()
-            bg_tasks.add_task(
-                self.generate_full_schedule,
-                user,
-                category,
-                req.goal,
-                req.comments,
-                req.duration,
-                str(session.id),
-            )
+    async def regenerate_missing_weeks(self, session_id: str, user_id: str):
+        """Queue generation of only the weeks that are missing from a session."""
+        session = await UserCategorySession.find_one({"_id": ObjectId(session_id)})
+        if session is None:
+            raise HTTPException(status_code=404, detail="Session not found")
+        if user_id != session.user_id:
+            raise HTTPException(status_code=403, detail="Permission denied")
+        if session.status in (SessionStatus.PENDING, SessionStatus.PROCESSING):
+            raise HTTPException(
+                status_code=409, detail="Session is already being generated")
+        if session.status == SessionStatus.COMPLETED:
+            raise HTTPException(
+                status_code=409, detail="Session is already completed")
+        if session.status == SessionStatus.ACTIVE and not session.missing_weeks:
             return session
 
+        # The worker skips weeks that are already stored, so a regular
+        # generation job only fills in the holes.
+        await self.update_session_status(session_id, SessionStatus.PENDING)
+        await self.job_queue.enqueue(session_id, user_id)
+        session.status = SessionStatus.PENDING
+        return session
+
+    async def _find_duplicate_session(
+        self, user_id: str, request_hash: str, idempotency_key: Optional[str]
+    ) -> Optional[UserCategorySession]:
+        if idempotency_key:
+            session = await UserCategorySession.find_one(
+                {"user_id": user_id, "idempotency_key": idempotency_key}
+            )
+            if session:
+                if session.request_hash != request_hash:
+                    raise HTTPException(
+                        status_code=422,
+                        detail="Idempotency-Key was already used for a different request",
+                    )
+                return session
+        return await UserCategorySession.find_one(
+            {"user_id": user_id, "inflight_key": request_hash}
+        )
+
+    async def create_session(
+        self, user_id: str, req: SessionCreateReq, idempotency_key: Optional[str] = None
+    ) -> UserCategorySession:
+        """Create a new training session and queue schedule generation.
+
+        A retry with the same Idempotency-Key, or an identical request while
+        the previous one is still PENDING/PROCESSING, returns that session
+        instead of starting another generation.
+        """
+        logger.info("🛠 Creating new training session...")
+        request_hash = session_request_hash(user_id, req)
+        lock_key = f"{user_id}:{request_hash}"
+        lock, users = _create_locks.get(lock_key, (asyncio.Lock(), 0))
+        _create_locks[lock_key] = (lock, users + 1)
+
+        try:
+            async with lock:
+                existing = await self._find_duplicate_session(
+                    user_id, request_hash, idempotency_key
+                )
+                if existing:
+                    logger.info(f"Reusing session {existing.id} for a duplicate create request.")
+                    return existing
+
+                user = await User.find_one({"_id": ObjectId(user_id)})
+                if not user:
+                    raise HTTPException(status_code=404, detail="User not found")
+
+                category = await Category.find_one({"_id": ObjectId(req.category_id)})
+                if not category:
+                    raise HTTPException(
+                        status_code=404, detail="Category not found")
+                session = UserCategorySession(
+                    user_id=user_id,
+                    category_id=req.category_id,
+                    goal=req.goal,
+                    comments=req.comments,
+                    duration=req.duration,
+                    batch=req.batch,
+                    mode=req.mode,
+                    target_weeks=(
+                        settings.LAZY_INITIAL_WEEKS
+                        if settings.LAZY_GENERATION and not req.batch
+                        else None
+                    ),
+                    idempotency_key=idempotency_key,
+                    request_hash=request_hash,
+                    inflight_key=request_hash,
+                )
+                try:
+                    await session.insert()
+                except DuplicateKeyError:
+                    # Another API process won the race for this request.
+                    existing = await self._find_duplicate_session(
+                        user_id, request_hash, idempotency_key
+                    )
+                    if existing:
+                        return existing
+                    raise
+                if not session.batch:
+                    try:
+                        await self.job_queue.enqueue(str(session.id), user_id)
+                    except Exception:
+                        # Nothing would ever generate this session, and its
+                        # inflight_key/idempotency_key would hand it to every
+                        # retry; drop it so a retry starts over.
+                        await session.delete()
+                        raise
+                return session
+
+        except HTTPException:
+            raise
         except Exception as e:
             logger.error(f"Failed to create session: {e}")
             raise HTTPException(
                 status_code=500, detail=f"Failed to create session: {str(e)}"
             )
-
-    async def get_sessions(self, user_id: str, status: str):
-        sessions = await UserCategorySession.find({"user_id": user_id,'status':status}).to_list()
-        return sessions
-
-    async def get_session_by_id(
-        self,
-        session_id: str,
-        offset: int = 0,
-    ):
+        finally:
+            lock, users = _create_locks[lock_key]
+            if users == 1:
+                del _create_locks[lock_key]
+            else:
+                _create_locks[lock_key] = (lock, users - 1)
+
+    async def _owned_session(self, session_id: str, user_id: str) -> UserCategorySession:
+        """The session, if it belongs to `user_id`.
+
+        Reading or ticking off days can trigger lazy generation (paid LLM
+        calls), so only the owner may do it.
+        """
         session = await UserCategorySession.find_one({"_id": ObjectId(session_id)})
         if session is None:
             raise HTTPException(status_code=404, detail="Session not found")
-        day_plans = (
-            await DayPlan.find(
-                {
-                    "_id": {
-                        "$in": [
-                            ObjectId(id) for id in session.ai_generated_plan_table_ids
-                        ]
-                    }
-                }
+        if user_id != session.user_id:
+            raise HTTPException(status_code=403, detail="Permission denied")
+        return session
+
+    async def get_sessions(self, user_id: str, status: str) -> List[UserCategorySession]:
+        """Deprecated: every matching session as a full document, as an array.
+
+        Kept for existing clients; new clients use list_sessions.
+        """
+        return await UserCategorySession.find(
+            {"user_id": user_id, "status": status}
+        ).sort(keyset_sort("last_updated", NEXT, descending=True)).to_list()
+
+    async def list_sessions(
+        self,
+        user_id: str,
+        status: str,
+        fields: Optional[List[str]] = None,
+        limit: int = 20,
+        cursor: Optional[str] = None,
+    ) -> SessionSummaryPage:
+        """A user's sessions, most recently updated first.
+
+        Only the SessionSummary fields (or the requested subset) are fetched,
+        so result and summary_table never leave the database.
+        """
+        query = {"user_id": user_id, "status": status}
+        if cursor:
+            direction, last_updated, last_id = decode_cursor(cursor)
+            if direction != NEXT:
+                raise HTTPException(status_code=400, detail="Invalid cursor")
+            query.update(
+                keyset_filter("last_updated", NEXT, last_updated, last_id, descending=True)
             )
-            .sort("date")
+
+        model = _summary_model(tuple(sorted(set(fields or []))))
+        sessions = (
+            await UserCategorySession.find(query)
+            .sort(keyset_sort("last_updated", NEXT, descending=True))
+            .limit(limit + 1)
+            .project(model)
+            .to_list()
+        )
+        page = SessionSummaryPage(items=sessions[:limit])
+        if len(sessions) > limit:
+            last = sessions[limit - 1]
+            page.next_cursor = encode_cursor(NEXT, last.last_updated, last.id)
+        return page
+
+    async def get_session_by_id(
+        self, session_id: str, user_id: str, offset: int = 0
+    ) -> List[DayPlan]:
+        """Deprecated skip-based paging: a plain list of 7 days from `offset`.
+
+        Kept so existing clients, which expect an array, keep working; new
+        clients use get_session_days.
+        """
+        session = await self._owned_session(session_id, user_id)
+        day_plans = (
+            await DayPlan.find({"session_id": session_id})
+            .sort(keyset_sort("date", NEXT))
             .skip(offset)
-            .limit(7)
+            .limit(DAYS_PER_WEEK)
             .to_list()
         )
-        print(len(day_plans))
+        if day_plans:
+            await self.schedule_ahead(session, day_plans[-1].day_number)
         return day_plans
 
+    async def get_session_days(
+        self,
+        session_id: str,
+        user_id: str,
+        cursor: Optional[str] = None,
+        month: Optional[int] = None,
+        week: Optional[int] = None,
+        limit: int = DAYS_PER_WEEK,
+    ) -> DayPlanPage:
+        """One page of a session's days, keyset-paginated on (date, _id).
+
+        Without a cursor the page starts at the first day, or at the given
+        (month, week).
+        """
+        session = await self._owned_session(session_id, user_id)
+
+        query = {"session_id": session_id}
+        direction = NEXT
+        by_week = cursor is None and month is not None and week is not None
+        if cursor:
+            direction, date, day_id = decode_cursor(cursor)
+            query.update(keyset_filter("date", direction, date, day_id))
+        elif by_week:
+            query.update(week_filter(month, week))
+
+        day_plans = (
+            await DayPlan.find(query)
+            .sort(keyset_sort("date", direction))
+            .limit(limit + 1)
+            .to_list()
+        )
+        has_more = len(day_plans) > limit
+        day_plans = day_plans[:limit]
+        if direction == PREV:
+            day_plans.reverse()
+
+        page = DayPlanPage(items=day_plans)
+        if day_plans:
+            first, last = day_plans[0], day_plans[-1]
+            if has_more or direction == PREV or by_week:
+                page.next_cursor = encode_cursor(NEXT, last.date, last.id)
+            at_start = (
+                not has_more if direction == PREV
+                else not cursor and (not by_week or (month, week) == (1, 1))
+            )
+            if not at_start:
+                page.prev_cursor = encode_cursor(PREV, first.date, first.id)
+            await self.schedule_ahead(session, last.day_number)
+        return page
+
     async def update_dayplan(
-        self, session_id: str, day_plan_id: str, data: DayPlanUpdate
+        self, session_id: str, day_plan_id: str, data: DayPlanUpdate, user_id: str
     ):
-        session = await UserCategorySession.find_one({"_id": ObjectId(session_id)})
-        if session is None:
-            raise HTTPException(status_code=404, detail="Session not found")
-        day_plan = await DayPlan.get(day_plan_id)
-        if not day_plan:
+        session = await self._owned_session(session_id, user_id)
+        # Only the fields sent are written, so a status tick cannot overwrite
+        # meals edited concurrently (and vice versa).
+        day_plan = await session_repository.update_day_plan(
+            session_id,
+            day_plan_id,
+            # exclude_unset: keep the client's meal/exercise dicts as sent,
+            # without the lenient models' defaults.
+            data.model_dump(include=data.model_fields_set, exclude_unset=True, mode="json"),
+        )
+        if day_plan is None:
             raise HTTPException(status_code=404, detail="DayPlan not found")
-        update_data = data.model_dump(exclude_unset=True)
-        for field, value in update_data.items():
-            setattr(day_plan, field, value)
-        await day_plan.save()
+        await self.schedule_ahead(session, day_plan.day_number)
         return day_plan
 
     async def complete_session(
@@ -235,16 +644,8 @@ class UserCategorySessionService:
             raise HTTPException(status_code=404, detail="Session not found")
 
         day_plans = (
-            await DayPlan.find(
-                {
-                    "_id": {
-                        "$in": [
-                            ObjectId(id) for id in session.ai_generated_plan_table_ids
-                        ]
-                    }
-                }
-            )
-            .sort("date")
+            await self._day_plans(session_id)
+            .project(DayPlanProgress)
             .to_list()
         )
         user = await User.find_one({"_id": ObjectId(user_id)})
@@ -258,14 +659,30 @@ class UserCategorySessionService:
                 status_code=404, detail="User, physical data, or category not found"
             )
 
+        bind_llm_attribution(session_id=session_id, user_id=user_id)
         progress_analysis = await self.schedule_generator.analyze_progress(
             user, session, category, physical_data, weight_after, day_plans
         )
-        session.status = SessionStatus.COMPLETED
-        session.result = progress_analysis
-        session.last_updated = datetime.utcnow()
-        physical_data.weight = weight_after
-        await session.save()
+        # The analysis takes a while; refuse to complete over a state change
+        # (e.g. a generation job) that happened in the meantime.
+        completed = await session_repository.update_session(
+            session_id,
+            {
+                "status": SessionStatus.COMPLETED,
+                "result": progress_analysis,
+                "summary_table": session.summary_table,
+                "inflight_key": None,
+            },
+            expected_version=session.version,
+        )
+        if completed is None:
+            raise HTTPException(
+                status_code=409,
+                detail="Session was modified while it was being completed, please retry",
+            )
+        await PhysicalData.find_one({"_id": physical_data.id}).update(
+            {"$set": {"weight": weight_after}}
+        )
         return progress_analysis
     
 
@@ -277,18 +694,20 @@ class UserCategorySessionService:
             raise HTTPException(status_code=403,detail='Permission denied')
         return session.result
 
+    async def get_llm_usage(self, session_id: str, user_id: str) -> Dict[str, Any]:
+        session = await session_repository.get_fields(session_id, "user_id")
+        if session is None:
+            raise HTTPException(status_code=404, detail="Session not found")
+        if user_id != session.get("user_id"):
+            raise HTTPException(status_code=403, detail='Permission denied')
+        return await llm_metrics.session_summary(session_id)
+
     async def generate_pdf(self, session_id: str):
         session = await UserCategorySession.get(ObjectId(session_id))
         if not session:
             raise HTTPException(status_code=404, detail="Session not found")
 
-        day_plans = await DayPlan.find(
-            {
-                "_id": {
-                    "$in": [ObjectId(id) for id in session.ai_generated_plan_table_ids]
-                }
-            }
-        ).to_list()
+        day_plans = await self._day_plans(session_id).to_list()
         if not day_plans:
             raise HTTPException(
                 status_code=404, detail="No data found for this session"
@@ -346,21 +765,18 @@ class UserCategorySessionService:
             for day in days:
                 # Process meals with proper text wrapping
                 def format_meal(meal_type):
-                    meals = [m for m in day.meals if m["meal"] == meal_type]
+                    meals = [m for m in day.meals if m.meal == meal_type]
                     if not meals:
                         return ""
                     foods = []
                     for m in meals:
-                        if isinstance(m["food"], list):
-                            foods.extend(m["food"])
-                        else:
-                            foods.append(str(m["food"]))
+                        foods.extend(m.food)
                     return Paragraph("\n".join(foods), styles["TableCell"])
 
                 # Format workouts with proper text wrapping
                 workouts = Paragraph(
                     "\n".join(
-                        f"{w['exercise']} ({w['calories_burned']} kcal)"
+                        f"{w.exercise} ({w.calories_burned} kcal)"
                         for w in day.workout
                     ),
                     styles["TableCell"],
@@ -0,0 +1,16 @@
+import asyncio
+import os
+
+import pytest
+
+pytestmark = pytest.mark.skipif(
+    not os.getenv("MONGO_URI"), reason="needs a MongoDB in MONGO_URI"
+)
+
+
+def test_hot_queries_use_an_index():
+    from benchmarks.explain_queries import explain_all
+
+    results = asyncio.run(explain_all())
+    scans = [f"{name}: {' <- '.join(stages)}" for name, stages in results if "COLLSCAN" in stages]
+    assert not scans, "COLLSCAN in winning plan:\n" + "\n".join(scans)
@@ -0,0 +1,29 @@
+import asyncio
+import logging
+import signal
+
+from src.core.container import close_llm_client, get_llm_client, init_llm_client
+from src.core.database import init_db
+from src.service.jobs import GenerationWorker
+from src.service.sessions import UserCategorySessionService
+
+
+async def main():
+    await init_db()
+    init_llm_client()
+
+    stop = asyncio.Event()
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        loop.add_signal_handler(sig, stop.set)
+
+    worker = GenerationWorker(UserCategorySessionService(get_llm_client()))
+    try:
+        await worker.run(stop)
+    finally:
+        await close_llm_client()
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    asyncio.run(main())